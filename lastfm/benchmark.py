@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+import dataclasses
+import datetime
+import gc
+import json
+import logging
+import os
+import pathlib
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import typing
+
+import pydantic
+
+import decoder
+import lastfm
+import standin
+
+PATHS = ('decode', 'full', 'trusted', 'projected', 'arrow') # `decode` only decodes the JSON, as a baseline for the others
+
+
+def image(idx: int) -> list[dict[str, str]]:
+    return [{'size': size, '#text': f'https://lastfm.freetls.fastly.net/i/u/{size}/{idx}.png'} for size in ('small', 'medium', 'large', 'extralarge')]
+
+def recenttracks(items: int) -> dict[str, typing.Any]:
+    return standin.History(plays=items).recenttracks(limit=items, nowplaying=False)
+
+def toptracks(items: int) -> dict[str, typing.Any]:
+    history = standin.History()
+    tracks = [{'streamable': {'fulltrack': '0', '#text': '0'}, 'mbid': history.mbid('track', idx), 'name': f'Track {idx}', 'image': image(idx), 'artist': {'url': f'https://www.last.fm/music/Artist+{idx % 200}', 'name': f'Artist {idx % 200}', 'mbid': history.mbid('artist', idx % 200)}, 'url': f'https://www.last.fm/music/Artist+{idx % 200}/_/Track+{idx}', 'duration': str(180 + idx % 120), '@attr': {'rank': str(idx + 1)}, 'playcount': str(items - idx)} for idx in range(items)]
+    return {'toptracks': {'track': tracks, '@attr': {'user': 'standin', 'totalPages': '10', 'page': '1', 'perPage': str(items), 'total': str(10 * items)}}}
+
+def similarartists(items: int) -> dict[str, typing.Any]:
+    history = standin.History()
+    artists = [{'name': f'Artist {idx}', 'mbid': history.mbid('artist', idx), 'match': f'{1 - idx / items:.6f}', 'url': f'https://www.last.fm/music/Artist+{idx}', 'image': image(idx), 'streamable': '0'} for idx in range(items)]
+    return {'similarartists': {'artist': artists, '@attr': {'artist': 'Artist'}}}
+
+def albuminfo(items: int) -> dict[str, typing.Any]:
+    history = standin.History()
+    artist = {'url': 'https://www.last.fm/music/Artist', 'name': 'Artist', 'mbid': history.mbid('artist', 1)}
+    tracks = [{'streamable': {'fulltrack': '0', '#text': '0'}, 'duration': 180 + idx % 120, 'url': f'https://www.last.fm/music/Artist/_/Track+{idx}', 'name': f'Track {idx}', '@attr': {'rank': idx + 1}, 'artist': artist} for idx in range(items)]
+    tags = {'tag': [{'url': f'https://www.last.fm/tag/tag{idx}', 'name': f'tag{idx}'} for idx in range(5)]}
+    wiki = {'published': '04 Nov 2007, 20:07', 'summary': 'Summary', 'content': 'Content'}
+    return {'album': {'artist': 'Artist', 'mbid': history.mbid('album', 1), 'tags': tags, 'playcount': '1000000', 'image': image(0), 'tracks': {'track': tracks}, 'url': 'https://www.last.fm/music/Artist/Album', 'name': 'Album', 'listeners': '100000', 'wiki': wiki}}
+
+
+@dataclasses.dataclass
+class Payload:
+    name: str
+    method: str
+    build: typing.Callable[[int], dict[str, typing.Any]]
+    fields: tuple[str, ...] # projected by the `projected` and `arrow` paths
+
+PAYLOADS = (
+    Payload('recenttracks', 'user.getRecentTracks', recenttracks, ('name', 'artist.name', 'album.name', 'date.uts')),
+    Payload('toptracks', 'user.getTopTracks', toptracks, ('name', 'playcount', 'artist.name')),
+    Payload('similarartists', 'artist.getSimilar', similarartists, ('name', 'match')),
+    Payload('albuminfo', 'album.getInfo', albuminfo, ()), # not a list response: no `projected` or `arrow` path
+    )
+
+
+@dataclasses.dataclass
+class Benchmark:
+    '''Time `lastfm.Validate.response` (including JSON decoding, see `decoder`) on synthetic payloads of `items` items along each of `PATHS`, and measure its memory per item; results are saved to `path` to be compared between runs.'''
+    items: int = 1000
+    repeat: int = 15
+    path: pathlib.Path = pathlib.Path(os.getenv('LASTFM_BENCHMARK_PATH', pathlib.Path(__file__).parent / 'benchmarks'))
+    tolerance: float = float(os.getenv('LASTFM_BENCHMARK_TOLERANCE', '0.2')) # relative slow-down reported as a regression
+
+    @staticmethod
+    def parse(payload: Payload, data: bytes, path: str) -> typing.Any:
+        response = decoder.loads(data)
+        if path == 'decode':
+            return response
+        mode = 'trusted' if path == 'projected' else path
+        return lastfm.Validate.response(response=response, method=payload.method, mode=mode, fields=(payload.fields if path in ('projected', 'arrow') else None))
+
+    @staticmethod
+    def supported(payload: Payload, path: str) -> bool:
+        if path in ('projected', 'arrow'):
+            return bool(payload.fields)
+        return True
+
+    def time(self, payload: Payload, data: bytes, path: str) -> list[float]:
+        '''Return the wall time of each repetition (after a warm-up call, which builds cached plans and validators) with the garbage collector disabled, as `timeit` does.'''
+        self.parse(payload, data, path)
+        times = []
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(self.repeat):
+                start = time.perf_counter()
+                self.parse(payload, data, path)
+                times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+        return times
+
+    def memory(self, payload: Payload, data: bytes, path: str) -> tuple[int, int, int]:
+        '''Return the peak Python heap allocated while parsing, the number of Python memory blocks still held by the result and the bytes it holds in the `pyarrow` memory pool (which `tracemalloc` does not see).'''
+        arrow = lambda: 0
+        if path == 'arrow':
+            import pyarrow
+            arrow = pyarrow.total_allocated_bytes
+        gc.collect()
+        blocks, buffers = sys.getallocatedblocks(), arrow()
+        tracemalloc.start()
+        try:
+            result = self.parse(payload, data, path)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        gc.collect()
+        retained, buffers = sys.getallocatedblocks() - blocks, arrow() - buffers
+        del result
+        return peak, retained, buffers
+
+    def run(self) -> dict[str, typing.Any]:
+        results = []
+        for payload in PAYLOADS:
+            data = json.dumps(payload.build(self.items)).encode('utf-8')
+            for path in filter(lambda path: self.supported(payload, path), PATHS):
+                times, (peak, blocks, buffers) = self.time(payload, data, path), self.memory(payload, data, path)
+                results.append({'payload': payload.name, 'path': path, 'items': self.items, 'bytes': len(data),
+                                'median_us_per_item': 1e6 * statistics.median(times) / self.items, 'min_us_per_item': 1e6 * min(times) / self.items,
+                                'peak_bytes_per_item': peak / self.items, 'blocks_per_item': blocks / self.items, 'arrow_bytes_per_item': buffers / self.items})
+                logging.info('{payload:>15} {path:>9} | {median_us_per_item:8.2f} µs/item (min {min_us_per_item:8.2f}) | {peak_bytes_per_item:9.0f} B/item peak (Python heap) | {blocks_per_item:6.1f} blocks/item | {arrow_bytes_per_item:6.0f} B/item in pyarrow'.format(**results[-1]))
+        return {'date': datetime.datetime.now(tz=datetime.timezone.utc).isoformat(timespec='seconds'), 'python': platform.python_version(), 'platform': platform.platform(),
+                'pydantic': pydantic.VERSION, 'decoder': decoder.loads.__name__, 'results': results}
+
+    def save(self, run: dict[str, typing.Any]) -> pathlib.Path:
+        self.path.mkdir(parents=True, exist_ok=True)
+        file = self.path / f"{run['date'].replace(':', '')}.json"
+        file.write_text(json.dumps(run, indent=1))
+        logging.info(f'saved to {file}')
+        return file
+
+    def previous(self, exclude: pathlib.Path = None) -> dict[str, typing.Any]|None:
+        '''Return the latest saved run (other than `exclude`).'''
+        files = sorted(file for file in self.path.glob('*.json') if file != exclude)
+        return json.loads(files[-1].read_bytes()) if files else None
+
+    def compare(self, run: dict[str, typing.Any], baseline: dict[str, typing.Any]) -> list[str]:
+        '''Log the change of the minimum time per item (less noisy than the median) of every (payload, path) since `baseline` and return the regressions beyond `tolerance`.'''
+        before = {(result['payload'], result['path']): result['min_us_per_item'] for result in baseline['results']}
+        regressions = []
+        for result in run['results']:
+            key = (result['payload'], result['path'])
+            if key not in before:
+                continue
+            ratio = result['min_us_per_item'] / before[key]
+            if ratio > 1 + self.tolerance:
+                regressions.append(f'{key[0]} {key[1]}: {before[key]:.2f} -> {result["min_us_per_item"]:.2f} µs/item ({ratio - 1:+.0%})')
+            logging.info(f'{key[0]:>15} {key[1]:>9} | {ratio - 1:+.0%} since {baseline["date"]}')
+        for regression in regressions:
+            logging.warning(f'regression: {regression}')
+        return regressions
+
+
+def main():
+    '''Run the benchmark, save its results and compare them with the previous run (exiting with status 1 on a regression).'''
+    lastfm.configureLogging(level=logging.INFO)
+    benchmark = Benchmark()
+    run = benchmark.run()
+    baseline = benchmark.previous()
+    benchmark.save(run)
+    if baseline and benchmark.compare(run, baseline):
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
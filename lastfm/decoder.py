@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+import codecs
+import json
+import logging
+import os
+import re
+import typing
+
+Buffer = bytes|bytearray|memoryview|str
+
+
+def stdlib(data: Buffer) -> typing.Any:
+    '''Decode with `json.loads`, which accepts `bytes` and `bytearray` (detecting the UTF encoding itself) but not `memoryview`.'''
+    return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+def orjson(data: Buffer) -> typing.Any:
+    '''[orjson](https://github.com/ijl/orjson) decodes any buffer directly and raises a subclass of `json.JSONDecodeError`.'''
+    import orjson
+    return orjson.loads(data)
+
+def msgspec(data: Buffer) -> typing.Any:
+    '''[msgspec](https://jcristharif.com/msgspec/) decodes any buffer directly; its errors are re-raised as `json.JSONDecodeError`.'''
+    import msgspec
+    try:
+        return msgspec.json.decode(data)
+    except msgspec.DecodeError as error:
+        raise json.JSONDecodeError(str(error), '', 0) from error
+
+BACKENDS = {'orjson': orjson, 'msgspec': msgspec, 'json': stdlib} # in order of preference
+
+
+def installed(decode: typing.Callable[[Buffer], typing.Any]) -> bool:
+    try:
+        decode(b'{}')
+        return True
+    except ImportError:
+        return False
+
+def backend(name: str = None) -> typing.Callable[[Buffer], typing.Any]:
+    '''Return the decoder named `name` (or by the `JSON_DECODER` environment variable), or else the fastest one installed.'''
+    name = name or os.getenv('JSON_DECODER')
+    if name and (name in BACKENDS) and installed(BACKENDS[name]):
+        return BACKENDS[name]
+    if name:
+        logging.warning(f'JSON decoder `{name}` is unknown or not installed; falling back on the fastest one available')
+    return next(decode for decode in BACKENDS.values() if installed(decode))
+
+loads = backend()
+
+def use(name: str) -> None:
+    '''Switch the decoder used by `loads` (one of `BACKENDS`).'''
+    global loads
+    loads = backend(name=name)
+
+
+class ItemStream:
+    '''Split the items of the JSON array under `key` out of a document received in chunks, keeping the rest of it as its `envelope`.'''
+    separator = re.compile(r'[\s,]*')
+
+    def __init__(self, key: str):
+        self.start = re.compile(rf'"{re.escape(key)}"\s*:\s*\[')
+        self.text = codecs.getincrementaldecoder('utf-8')() # chunks may split multi-byte characters
+        self.json = json.JSONDecoder()
+        self.buffer, self.prefix, self.suffix = '', None, None
+
+    def feed(self, chunk: Buffer) -> list[typing.Any]:
+        '''Return the items completed by `chunk`.'''
+        self.buffer += self.text.decode(bytes(chunk)) if not isinstance(chunk, str) else chunk
+        if self.suffix is not None:
+            self.suffix, self.buffer = self.suffix + self.buffer, ''
+            return []
+        if self.prefix is None:
+            match = self.start.search(self.buffer)
+            if not match:
+                return []
+            self.prefix, self.buffer = self.buffer[:match.end()], self.buffer[match.end():]
+        items, pos = [], 0
+        while True:
+            pos = self.separator.match(self.buffer, pos).end()
+            if self.buffer.startswith(']', pos):
+                self.suffix, self.buffer = self.buffer[pos:], ''
+                return items
+            try:
+                item, pos = self.json.raw_decode(self.buffer, pos)
+            except json.JSONDecodeError: # incomplete item: wait for the next chunk
+                self.buffer = self.buffer[pos:]
+                return items
+            items.append(item)
+
+    def envelope(self) -> typing.Any:
+        '''Decode the rest of the document, once it has been fed entirely.'''
+        if self.suffix is None:
+            raise json.JSONDecodeError(f'unterminated array or missing key: {self.start.pattern}', self.buffer[:100], 0)
+        return loads(self.prefix + self.suffix + self.text.decode(b'', final=True))
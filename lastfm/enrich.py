@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+import concurrent.futures
+import dataclasses
+import logging
+import typing
+
+import lastfm
+import models
+
+KEYS = ('artist', 'track', 'album', 'mbid')
+COLUMNS = { # column: (attribute path within `models.track.Track`, `pyarrow` type name)
+    'name': (('name',), 'string'),
+    'track_mbid': (('mbid',), 'string'),
+    'url': (('url',), 'string'),
+    'duration': (('duration',), 'int64'),
+    'listeners': (('listeners',), 'int64'),
+    'playcount': (('playcount',), 'int64'),
+    'userplaycount': (('userplaycount',), 'int64'),
+    'userloved': (('userloved',), 'bool_'),
+    'artist_name': (('artist', 'name'), 'string'),
+    'artist_mbid': (('artist', 'mbid'), 'string'),
+    'album_title': (('album', 'title'), 'string'),
+    'album_mbid': (('album', 'mbid'), 'string'),
+    }
+
+
+@dataclasses.dataclass
+class Enrich:
+    '''Bulk `track.getInfo` for (artist, track[, album, mbid]) rows, returned as a `pyarrow.Table` aligned to the input rows.'''
+    user: str = None # adds `userplaycount` and `userloved`
+    concurrency: int = 8
+    autocorrect: bool = True
+
+    @staticmethod
+    def rows(data: typing.Iterable[typing.Sequence|dict[str, typing.Any]]|typing.Any) -> list[dict[str, typing.Any]]:
+        '''Normalize `data` (a `pandas.DataFrame`, a `pyarrow.Table`, or an iterable of tuples or dicts) into dicts with `KEYS`.'''
+        if hasattr(data, 'to_pylist'):
+            data = data.to_pylist()
+        elif hasattr(data, 'to_dict'):
+            data = data.to_dict(orient='records')
+        rows = [row if isinstance(row, dict) else dict(zip(KEYS, row)) for row in data]
+        return [{key: (None if (row.get(key) is None) or (row.get(key) != row.get(key)) or (row.get(key) == '') else row.get(key)) for key in KEYS} for row in rows] # `NaN != NaN`
+
+    @staticmethod
+    def key(row: dict[str, typing.Any]) -> tuple[str, ...]:
+        '''Deduplicate rows on their mbid, or else on their case-folded artist and track names (`track.getInfo` ignores the album).'''
+        return (str(row['mbid']).lower(),) if row['mbid'] else (str(row['artist']).casefold(), str(row['track']).casefold())
+
+    def fetch(self, row: dict[str, typing.Any]) -> tuple[str, int|None, models.track.Track|None]:
+        '''Request `track.getInfo` for `row` and return its (status, error code, response).'''
+        params = dict(mbid=row['mbid']) if row['mbid'] else dict(artist=row['artist'], track=row['track'], autocorrect=int(self.autocorrect))
+        try:
+            response = lastfm.Request.get(method='track.getInfo', user=self.user, api_key=lastfm.API_KEY, mode='trusted', **params)
+        except Exception as error:
+            logging.error(f'{type(error).__name__}: {error} | {params}')
+            return type(error).__name__, None, None
+        if isinstance(response, models.Error):
+            code = response.error
+            return (lastfm.Errors(code).name if code in {e.value for e in lastfm.Errors} else 'ERROR'), code, None
+        return ('ok', None, response) if response else ('EMPTY_RESPONSE', None, None)
+
+    @staticmethod
+    def extract(response: models.track.Track|None, path: tuple[str, ...]) -> typing.Any:
+        for attr in path:
+            response = getattr(response, attr, None)
+        return None if response is None else str(response) if not isinstance(response, (bool, int, float, str)) else response
+
+    def tracks(self, data: typing.Iterable[typing.Sequence|dict[str, typing.Any]]|typing.Any) -> pyarrow.Table:
+        '''Enrich every row of `data` (see `Enrich.rows`) with `COLUMNS`, `tags`, `status` ('ok' or the name of the error) and `code` (the Last.fm error code, if any).'''
+        import pyarrow
+        rows = self.rows(data)
+        distinct = {}
+        for row in rows:
+            distinct.setdefault(self.key(row), row)
+        logging.info(f'enriching {len(distinct)} distinct tracks out of {len(rows)} rows')
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = dict(zip(distinct, executor.map(self.fetch, distinct.values())))
+        results = [results[self.key(row)] for row in rows]
+        columns = {key: pyarrow.array([str(row[key]) if row[key] is not None else None for row in rows], type=pyarrow.string()) for key in KEYS}
+        columns |= {column: pyarrow.array([self.extract(response, path) for _, _, response in results], type=getattr(pyarrow, arrow)()) for column, (path, arrow) in COLUMNS.items()}
+        columns['tags'] = pyarrow.array([[tag.name for tag in response.toptags.tag] if (response and response.toptags) else None for _, _, response in results], type=pyarrow.list_(pyarrow.string()))
+        columns['status'] = pyarrow.array([status for status, _, _ in results], type=pyarrow.string())
+        columns['code'] = pyarrow.array([code for _, code, _ in results], type=pyarrow.int64())
+        return pyarrow.table(columns)
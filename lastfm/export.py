@@ -21,6 +21,8 @@ import rich.progress
 
 from api import auth
 from api import user
+import decoder
+import lastfm
 import log
 import param
 
@@ -45,10 +47,10 @@ class Disk:
     @staticmethod
     async def readTracks(file: pathlib.Path) -> int:
         '''Calculate number of track plays on disk for `file`.'''
-        async with aiofiles.open(file, mode='r') as f:
+        async with aiofiles.open(file, mode='rb') as f:
             data = await f.read()
         try:
-            return json.loads(data).get('recenttracks').get('track')
+            return decoder.loads(data).get('recenttracks').get('track')
         except json.decoder.JSONDecodeError as error:
             log.log.error(f'JSON decode error when reading exported file: "{file}"\n') # please remove incomplete/corrupted file(s)\n')
             return list()
@@ -81,8 +83,9 @@ class Playcount:
         '''Query playcount for `year`'''
         FROM, TO = yearRange(year=year)
         url = httpx.URL(url=param.url, params={**PARAMS, 'from': FROM, 'to': TO, 'page': 1, 'limit': 1})
+        await lastfm.RateLimit.aacquire()
         response = await async_client.get(url=url)
-        return int(response.json().get('recenttracks').get('@attr').get('total'))
+        return int(decoder.loads(response.content).get('recenttracks').get('@attr').get('total'))
 
     @classmethod
     async def overall(cls, begin_year: int, end_year: int) -> dict[str, int]:
@@ -90,7 +93,7 @@ class Playcount:
         log.log.info(f'Querying playcount per year for {begin_year}-{end_year}')
         async with httpx.AsyncClient(timeout=HTTPX_TIMEOUT) as async_client:
             jobs = [functools.partial(cls.annual, year=year, async_client=async_client) for year in range(begin_year, end_year+1)]
-            playcount = await aiometer.run_all(jobs, max_per_second=1/param.sleep)
+            playcount = await aiometer.run_all(jobs) # paced by `lastfm.RateLimit`, shared with every other client on this host
         year = list(map(str, range(begin_year, end_year+1)))
         return dict(zip(year, playcount))
 
@@ -101,24 +104,34 @@ class Response:
     progress: rich.progress.Progress
     task: rich.progress.Task
     async_client: httpx.AsyncClient
+    envelope: dict[str, typing.Any] = None # rest of the response (`@attr`), once collected
 
-    async def collect(self) -> dict[str, typing.Any]:
-        '''Stream async GET request with `rich.progress`.'''
-        data = bytearray()
+    async def collect(self) -> typing.AsyncIterator[dict[str, typing.Any]]:
+        '''Stream async GET request with `rich.progress`, yielding each `recenttracks.track` item as soon as it has been received (see `decoder.ItemStream`); the rest of the response is then available as `self.envelope`.'''
+        stream = decoder.ItemStream(key='track')
+        await lastfm.RateLimit.aacquire()
         async with self.async_client.stream(method='GET', url=self.url, headers=param.headers) as response:
             self.task.total = int(response.headers.get('Content-Length'))
             async for chunk in response.aiter_bytes():
-                data.extend(chunk)
+                for track in stream.feed(chunk):
+                    yield track
                 self.progress.update(task_id=self.task.id, completed=response.num_bytes_downloaded)
-        return json.loads(data.decode('utf-8'))
+        self.envelope = stream.envelope()
 
     async def download(self) -> None:
-        '''Query `self.url`, remove `nowplaying` track from response, and write to disk.'''
-        response = await self.collect()
-        response['recenttracks']['track'] = [track for track in response.get('recenttracks').get('track') if not track.get('@attr')] # remove `nowplaying` track from response
+        '''Query `self.url` and write each track to disk as it arrives, skipping the `nowplaying` track; the file is only renamed into place once complete.'''
         filepath = pathlib.Path(f'{EXPORT_PATH}/{self.task.description}.json')
-        with filepath.open(mode='w') as out_file:
-            json.dump(obj=response, fp=out_file)
+        partial = filepath.with_suffix('.json.part')
+        with partial.open(mode='w') as out_file:
+            out_file.write('{"recenttracks": {"track": [')
+            separator = ''
+            async for track in self.collect():
+                if track.get('@attr'): # remove `nowplaying` track from response
+                    continue
+                out_file.write(separator + json.dumps(track))
+                separator = ', '
+            out_file.write('], "@attr": ' + json.dumps(self.envelope.get('recenttracks').get('@attr')) + '}}')
+        partial.replace(filepath)
 
 
 @dataclasses.dataclass
@@ -184,7 +197,7 @@ async def exportYear(year: int) -> None:
     with rich.live.Live(progress):
         async with httpx.AsyncClient(timeout=HTTPX_TIMEOUT) as async_client:
             jobs = [Response(url=url, progress=progress, task=progress.tasks[task_id], async_client=async_client).download for task_id, url in enumerate(urls)]
-            await aiometer.run_all(jobs, max_per_second=1/param.sleep)
+            await aiometer.run_all(jobs) # paced by `lastfm.RateLimit`
 
 async def export(force: bool = False) -> None:
     '''Export all last.fm data for `PARAMS['user']`.'''
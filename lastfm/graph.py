@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+import array
+import concurrent.futures
+import dataclasses
+import json
+import logging
+import os
+import pathlib
+import threading
+import typing
+
+import lastfm
+
+MAGIC = b'LFMCSR01'
+ALIGN = 64 # bytes, so that every array can be memory-mapped on its natural boundary
+
+
+@dataclasses.dataclass
+class Graph:
+    '''Directed similar-artist graph in compressed sparse row form, with the `match` of each edge as its weight and UTF-8 node names.'''
+    indptr: typing.Any # numpy.ndarray[int64], `nodes + 1`
+    indices: typing.Any # numpy.ndarray[int32], `edges`
+    weights: typing.Any # numpy.ndarray[float32], `edges`
+    offsets: typing.Any # numpy.ndarray[int64], `nodes + 1`
+    names: typing.Any # numpy.ndarray[uint8], UTF-8 bytes of every name
+    depths: typing.Any # numpy.ndarray[int8], depth (hops from the seeds) at which each node was expanded, or -1 for the nodes of the last level
+    arrays: typing.ClassVar[tuple[str, ...]] = ('indptr', 'indices', 'weights', 'offsets', 'names', 'depths')
+
+    @property
+    def nodes(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def edges(self) -> int:
+        return len(self.indices)
+
+    def name(self, node: int) -> str:
+        return bytes(self.names[self.offsets[node]:self.offsets[node+1]]).decode('utf-8')
+
+    def index(self) -> dict[str, int]:
+        '''Map the casefolded name of every node to its id (built on demand, since the file does not store it).'''
+        return {lastfm.Corrections.fold(self.name(node)): node for node in range(self.nodes)}
+
+    def neighbours(self, node: int) -> list[tuple[str, float]]:
+        '''Return the (name, match) of the neighbours of `node`, most similar first.'''
+        start, stop = self.indptr[node], self.indptr[node+1]
+        return [(self.name(int(idx)), float(weight)) for idx, weight in zip(self.indices[start:stop], self.weights[start:stop])]
+
+    def save(self, file: pathlib.Path|str) -> pathlib.Path:
+        '''Write a JSON header followed by the arrays, each aligned to `ALIGN` bytes, and rename the file into place once complete.'''
+        file = pathlib.Path(file)
+        arrays = {name: getattr(self, name) for name in self.arrays}
+        header, offset = {}, 0
+        for name, values in arrays.items():
+            header[name] = {'dtype': values.dtype.str, 'shape': list(values.shape), 'offset': offset}
+            offset += -(-values.nbytes // ALIGN) * ALIGN
+        encoded = json.dumps(header).encode('utf-8')
+        start = -(-(len(MAGIC) + 8 + len(encoded)) // ALIGN) * ALIGN
+        part = file.with_suffix(file.suffix + '.part')
+        with open(part, 'wb') as f:
+            f.write(MAGIC + len(encoded).to_bytes(8, 'little') + encoded)
+            for name, values in arrays.items():
+                f.seek(start + header[name]['offset'])
+                f.write(values.tobytes())
+            f.truncate(start + offset)
+        part.replace(file)
+        logging.info(f'saved {self.nodes} nodes and {self.edges} edges to {file}')
+        return file
+
+    @classmethod
+    def load(cls, file: pathlib.Path|str, mmap: bool = True) -> Graph:
+        '''Read a graph written by `save`, memory-mapping its arrays (read-only) unless `mmap` is `False`.'''
+        import numpy
+        with open(file, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f'not a similar-artist graph: {file}')
+            size = int.from_bytes(f.read(8), 'little')
+            header = json.loads(f.read(size))
+        start = -(-(len(MAGIC) + 8 + size) // ALIGN) * ALIGN
+        arrays = {}
+        for name, spec in header.items():
+            dtype, shape, offset = numpy.dtype(spec['dtype']), tuple(spec['shape']), start + spec['offset']
+            if not numpy.prod(shape):
+                arrays[name] = numpy.zeros(shape, dtype=dtype)
+            elif mmap:
+                arrays[name] = numpy.memmap(file, dtype=dtype, mode='r', offset=offset, shape=shape)
+            else:
+                arrays[name] = numpy.fromfile(file, dtype=dtype, count=int(numpy.prod(shape)), offset=offset).reshape(shape)
+        return cls(**arrays)
+
+
+@dataclasses.dataclass
+class Crawl:
+    '''Breadth-first crawl of `artist.getSimilar` around some seed artists, bounded by `depth`, `fanout`, `min_match` and `max_nodes`.'''
+    depth: int = 2
+    fanout: int = 50
+    min_match: float = 0.0
+    max_nodes: int = 100_000
+    concurrency: int = int(os.getenv('LASTFM_CRAWL_CONCURRENCY', '8'))
+    autocorrect: bool = True
+
+    def __post_init__(self):
+        self.ids: dict[str, int] = {} # casefolded name: node id
+        self.names: list[str] = []
+        self.depths = array.array('b')
+        self.sources, self.targets, self.weights = array.array('i'), array.array('i'), array.array('f') # 10 bytes per edge
+        self.lock = threading.Lock()
+
+    def node(self, name: str) -> tuple[int|None, bool]:
+        '''Return the id of artist `name` and whether it was just added (unless `max_nodes` has been reached, in which case the id is `None`).'''
+        key = lastfm.Corrections.fold(name)
+        with self.lock:
+            if key in self.ids:
+                return self.ids[key], False
+            if len(self.names) >= self.max_nodes:
+                return None, False
+            self.ids[key] = len(self.names)
+            self.names.append(name)
+            self.depths.append(-1)
+            return self.ids[key], True
+
+    def similar(self, name: str) -> list[tuple[str, float]]:
+        '''Return the (name, match) of the artists similar to `name`, or nothing if the request failed.'''
+        try:
+            response = lastfm.Request.get(method='artist.getSimilar', artist=name, limit=self.fanout, autocorrect=int(self.autocorrect), api_key=lastfm.API_KEY, mode='arrow', fields=('name', 'match'))
+        except Exception as error:
+            logging.error(f'{type(error).__name__}: {error} | {name}')
+            return []
+        if not hasattr(response, 'column'): # `models.Error` or no response
+            logging.warning(f'no similar artists: {name} | {response}')
+            return []
+        return [(similar, match) for similar, match in zip(response.column('name').to_pylist(), response.column('match').to_pylist()) if similar and (match or 0) >= self.min_match]
+
+    def expand(self, node: int, depth: int) -> list[int]:
+        '''Fetch the neighbours of `node`, record its edges and return the ids of the artists it discovered.'''
+        similar = self.similar(self.names[node])
+        discovered, targets, weights = [], array.array('i'), array.array('f')
+        for name, match in similar:
+            target, added = self.node(name)
+            if target is None:
+                continue
+            if added:
+                discovered.append(target)
+            targets.append(target)
+            weights.append(match)
+        with self.lock:
+            self.depths[node] = depth
+            self.sources.extend(array.array('i', [node]) * len(targets))
+            self.targets.extend(targets)
+            self.weights.extend(weights)
+        return discovered
+
+    @staticmethod
+    def seeds(user: str, limit: int = 50, period: str = 'overall') -> list[str]:
+        '''Return the names of the top artists of `user`, to seed a crawl.'''
+        response = lastfm.Request.get(method='user.getTopArtists', user=user, limit=limit, period=period, api_key=lastfm.API_KEY, mode='arrow', fields=('name',))
+        return response.column('name').to_pylist() if hasattr(response, 'column') else []
+
+    def crawl(self, seeds: typing.Iterable[str]) -> Graph:
+        '''Expand the graph level by level from `seeds` and return it.'''
+        frontier = sorted(set(node for node, _ in map(self.node, seeds) if node is not None))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for depth in range(self.depth):
+                logging.info(f'depth {depth}: expanding {len(frontier)} artists ({len(self.names)} artists and {len(self.targets)} edges so far)')
+                discovered = executor.map(self.expand, frontier, [depth] * len(frontier))
+                frontier = [node for nodes in discovered for node in nodes] # each node is only discovered once
+                if not frontier:
+                    break
+        return self.graph()
+
+    def graph(self) -> Graph:
+        '''Pack the edges collected so far into a `Graph` (each node's neighbours sorted by decreasing match).'''
+        import numpy
+        sources = numpy.frombuffer(self.sources, dtype=numpy.int32)
+        targets = numpy.frombuffer(self.targets, dtype=numpy.int32)
+        weights = numpy.frombuffer(self.weights, dtype=numpy.float32)
+        order = numpy.lexsort((-weights, sources))
+        indptr = numpy.zeros(len(self.names) + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.bincount(sources, minlength=len(self.names)), out=indptr[1:])
+        names = [name.encode('utf-8') for name in self.names]
+        offsets = numpy.zeros(len(names) + 1, dtype=numpy.int64)
+        numpy.cumsum([len(name) for name in names], out=offsets[1:])
+        return Graph(indptr=indptr, indices=targets[order], weights=weights[order], offsets=offsets, names=numpy.frombuffer(b''.join(names), dtype=numpy.uint8), depths=numpy.frombuffer(self.depths, dtype=numpy.int8).copy())
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+'''Vendored ISO 3166-1 country names and ISO 639-1 language codes (lowercased), generated by `lastfm.ISOcodes.vendor` from [isocodes](https://github.com/Atem18/isocodes) so that importing `lastfm` never reads or downloads the full JSON tables.'''
+
+COUNTRIES = tuple((
+    'afghanistan|albania|algeria|american samoa|andorra|angola|anguilla|antarctica|antigua and barbuda|argentina|armenia|aruba|australia|austria|'
+    'azerbaijan|bahamas|bahrain|bangladesh|barbados|belarus|belgium|belize|benin|bermuda|bhutan|bolivia, plurinational state of|'
+    'bonaire, sint eustatius and saba|bosnia and herzegovina|botswana|bouvet island|brazil|british indian ocean territory|brunei darussalam|'
+    'bulgaria|burkina faso|burundi|cabo verde|cambodia|cameroon|canada|cayman islands|central african republic|chad|chile|china|christmas island|'
+    'cocos (keeling) islands|colombia|comoros|congo|congo, the democratic republic of the|cook islands|costa rica|croatia|cuba|curaçao|cyprus|'
+    "czechia|côte d'ivoire|denmark|djibouti|dominica|dominican republic|ecuador|egypt|el salvador|equatorial guinea|eritrea|estonia|eswatini|"
+    'ethiopia|falkland islands (malvinas)|faroe islands|fiji|finland|france|french guiana|french polynesia|french southern territories|gabon|'
+    'gambia|georgia|germany|ghana|gibraltar|greece|greenland|grenada|guadeloupe|guam|guatemala|guernsey|guinea|guinea-bissau|guyana|haiti|'
+    'heard island and mcdonald islands|holy see (vatican city state)|honduras|hong kong|hungary|iceland|india|indonesia|iran, islamic republic of|'
+    "iraq|ireland|isle of man|israel|italy|jamaica|japan|jersey|jordan|kazakhstan|kenya|kiribati|korea, democratic people's republic of|"
+    "korea, republic of|kuwait|kyrgyzstan|lao people's democratic republic|latvia|lebanon|lesotho|liberia|libya|liechtenstein|lithuania|"
+    'luxembourg|macao|madagascar|malawi|malaysia|maldives|mali|malta|marshall islands|martinique|mauritania|mauritius|mayotte|mexico|'
+    'micronesia, federated states of|moldova, republic of|monaco|mongolia|montenegro|montserrat|morocco|mozambique|myanmar|namibia|nauru|nepal|'
+    'netherlands|new caledonia|new zealand|nicaragua|niger|nigeria|niue|norfolk island|north macedonia|northern mariana islands|norway|oman|'
+    'pakistan|palau|palestine, state of|panama|papua new guinea|paraguay|peru|philippines|pitcairn|poland|portugal|puerto rico|qatar|romania|'
+    'russian federation|rwanda|réunion|saint barthélemy|saint helena, ascension and tristan da cunha|saint kitts and nevis|saint lucia|'
+    'saint martin (french part)|saint pierre and miquelon|saint vincent and the grenadines|samoa|san marino|sao tome and principe|saudi arabia|'
+    'senegal|serbia|seychelles|sierra leone|singapore|sint maarten (dutch part)|slovakia|slovenia|solomon islands|somalia|south africa|'
+    'south georgia and the south sandwich islands|south sudan|spain|sri lanka|sudan|suriname|svalbard and jan mayen|sweden|switzerland|'
+    'syrian arab republic|taiwan, province of china|tajikistan|tanzania, united republic of|thailand|timor-leste|togo|tokelau|tonga|'
+    'trinidad and tobago|tunisia|turkmenistan|turks and caicos islands|tuvalu|türkiye|uganda|ukraine|united arab emirates|united kingdom|'
+    'united states|united states minor outlying islands|uruguay|uzbekistan|vanuatu|venezuela, bolivarian republic of|viet nam|'
+    'virgin islands, british|virgin islands, u.s.|wallis and futuna|western sahara|yemen|zambia|zimbabwe|åland islands'
+).split('|'))
+
+LANGUAGES = tuple((
+    'aa|ab|ae|af|ak|am|an|ar|as|av|ay|az|ba|be|bg|bh|bi|bm|bn|bo|br|bs|ca|ce|ch|co|cr|cs|cu|cv|cy|da|de|dv|dz|ee|el|en|eo|es|et|eu|fa|ff|fi|fj|fo|'
+    'fr|fy|ga|gd|gl|gn|gu|gv|ha|he|hi|ho|hr|ht|hu|hy|hz|ia|id|ie|ig|ii|ik|io|is|it|iu|ja|jv|ka|kg|ki|kj|kk|kl|km|kn|ko|kr|ks|ku|kv|kw|ky|la|lb|lg|'
+    'li|ln|lo|lt|lu|lv|mg|mh|mi|mk|ml|mn|mr|ms|mt|my|na|nb|nd|ne|ng|nl|nn|no|nr|nv|ny|oc|oj|om|or|os|pa|pi|pl|ps|pt|qu|rm|rn|ro|ru|rw|sa|sc|sd|se|'
+    'sg|si|sk|sl|sm|sn|so|sq|sr|ss|st|su|sv|sw|ta|te|tg|th|ti|tk|tl|tn|to|tr|ts|tt|tw|ty|ug|uk|ur|uz|ve|vi|vo|wa|wo|xh|yi|yo|za|zh|zu'
+).split('|'))
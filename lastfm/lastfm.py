@@ -1,38 +1,66 @@
 #!/usr/bin/env python3
 
 from __future__ import annotations
+import asyncio
+import atexit
+import concurrent.futures
+import contextlib
+import contextvars
 import dataclasses
 import datetime
+import email.utils
 import enum
+import functools
 import hashlib
 import html.parser
 import json
 import logging
 import os
 import pathlib
+import random
+import re
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
 import typing
 import urllib
 import uuid
+import weakref
 import xml.etree.ElementTree
 
-import dateparser
-import rich.logging
+import httpx
 import pydantic
 import typing_extensions
 
+import decoder
+import isocodes
+import log
+import metrics
 import models
 
+try:
+    import fcntl
+except ImportError: # not available on Windows, where `RateLimit` only coordinates threads within a single process
+    fcntl = None
+
 try:
     API_KEY = uuid.UUID(os.environ['LASTFM_KEY']).hex # [Create API account](https://www.last.fm/api/account/create) [API Applications(https://www.last.fm/api/accounts)
 except KeyError as error:
     logging.error('Please define your last.fm api_key as an environment variable:\nexport LASTFM_KEY=your_lastfm_api_key')
     raise SystemExit
 
-logging.basicConfig(level=logging.DEBUG, format='%(message)s', handlers=[rich.logging.RichHandler(rich_tracebacks=True, log_time_format='[%Y-%m-%d %H:%M:%S]')])
-
-HEADERS = {'User-Agent': 'delannoy/0.2 (a@delannoy.cc)'}
+HEADERS = {'User-Agent': 'delannoy/0.2 (a@delannoy.cc)', 'Accept-Encoding': 'gzip'}
 FORMAT = 'json'
 VALIDATE_RESPONSE = True if (FORMAT == 'json') else False
+ASYNC = contextvars.ContextVar('ASYNC', default=False) # set while an `aio` coroutine calls its synchronous counterpart, so that `Request` hands the request over to `AsyncRequest`
+TRUSTED_ARGUMENTS = contextvars.ContextVar('TRUSTED_ARGUMENTS', default=False) # set by `Validate.trusted_arguments` to skip the argument validation of `Validate.call`
+
+
+def configureLogging(level: int|str = None, style: str = None) -> None:
+    '''Log to the console from a background thread, through `rich` or a plain formatter (see `log.configure`).'''
+    log.configure(level=level, style=style)
 
 
 class MethodParser(html.parser.HTMLParser):
@@ -89,6 +117,9 @@ class Validate:
     artist: str = '`artist` must be provided unless `mbid` is specified'
     track: str = '`artist` and `track` must be provided unless `mbid` is specified'
     sk: str = '`session_key` is required; run `Auth.main()` to obtain one and define it as an environment variable:\nexport LASTFM_SESSION_KEY=your_lastfm_session_key'
+    mode: str = 'full' # default validation mode of `Validate.response`
+    sample: int = 10
+    modes: typing.ClassVar[tuple[str, ...]] = ('full', 'sample', 'trusted', 'arrow') # `sample` validates the first `sample` items only, `trusted` skips validation (`models.Trusted`) and `arrow` decodes list items into a `pyarrow.Table` (`models.Columnar`)
 
     @staticmethod
     def kwargs(check: bool, message: str) -> None:
@@ -96,6 +127,30 @@ class Validate:
         if not check:
             raise ValueError(message)
 
+    @staticmethod
+    def call(function: typing.Callable) -> typing.Callable:
+        '''Drop-in for `pydantic.validate_call` which only builds (and caches) the validator on the first call of `function`, and which is bypassed within `Validate.trusted_arguments`.'''
+        validated = None
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            nonlocal validated
+            if TRUSTED_ARGUMENTS.get():
+                return function(*args, **kwargs)
+            if validated is None:
+                validated = pydantic.validate_call(function)
+            return validated(*args, **kwargs)
+        return wrapper
+
+    @staticmethod
+    @contextlib.contextmanager
+    def trusted_arguments() -> typing.Iterator[None]:
+        '''Skip argument validation (and conversion) of the API methods called within this context, for internal callers which already pass well-typed arguments (e.g. unix timestamps rather than date strings, comma-separated rather than iterable `tags`).'''
+        token = TRUSTED_ARGUMENTS.set(True)
+        try:
+            yield
+        finally:
+            TRUSTED_ARGUMENTS.reset(token)
+
     @classmethod
     def num_results(cls, response: Type.json, limit: int):
         '''Navigate nested keys in `response` until reaching a list of results, and compare its length to `limit`.'''
@@ -108,9 +163,20 @@ class Validate:
         if isinstance(response[entity], list) and (len(response[entity]) != limit):
             logging.warning(f'a different numnber of results were returned ({len(response[entity])}) than requested ({limit})')
 
+    @staticmethod
+    def truncate(data: typing.Any, size: int) -> typing.Any:
+        '''Copy `data`, keeping only the first `size` items of every nested list.'''
+        if isinstance(data, dict):
+            return {key: Validate.truncate(val, size) for key, val in data.items()}
+        if isinstance(data, list):
+            return [Validate.truncate(val, size) for val in data[:size]]
+        return data
+
     @classmethod
-    def response(cls, response: Type.json, method: str, limit: int = None) -> pydantic.BaseModel:
-        '''Determine the top level `entity` in the response and call the corresponding `pydantic` model to validate it.'''
+    def response(cls, response: Type.json, method: str, limit: int = None, mode: str = None, fields: typing.Iterable[str] = None) -> pydantic.BaseModel|models.Projected|pyarrow.Table:
+        '''Determine the top level `entity` in the response and build the corresponding `pydantic` model according to `mode`, restricted to `fields` if given (see `models.Projection`).'''
+        mode = mode or cls.mode
+        cls.kwargs(check=(mode in cls.modes), message=f'`mode` must be one of {cls.modes}')
         if (FORMAT != 'json') or (not response):
             return response
         if 'error' in response:
@@ -121,7 +187,15 @@ class Validate:
         if limit:
             cls.num_results(response=response, limit=limit)
         model = getattr(getattr(models, method.split('.')[0]), entity.capitalize())
-        return model(**response)
+        if (mode == 'arrow') and models.Projection.locate(model)[1]:
+            return models.Columnar.table(model, response, paths=fields)
+        if fields:
+            return models.Projection.project(model, response, paths=fields)
+        if mode == 'full':
+            return model(**response)
+        if mode == 'sample':
+            model(**cls.truncate(response, size=cls.sample))
+        return models.Trusted.construct(model, response)
 
 
 class ISOcodes:
@@ -140,14 +214,27 @@ class ISOcodes:
         return sorted(set(_[field].lower() for _ in json.loads(response)[key] if _.get(field)))
 
     @classmethod
-    def countries(cls) -> list[str]:
-        '''Return list of ISO 3166-1 country names.'''
-        return cls.isocodes('countries')
+    def vendor(cls, file: pathlib.Path = None) -> None:
+        '''Regenerate the compact `isocodes` module (or `file`) from the upstream JSON tables.'''
+        file = file or pathlib.Path(isocodes.__file__)
+        def table(name: str, codes: list[str], width: int = 140) -> str:
+            lines = ['']
+            for code in codes:
+                lines += [''] if (lines[-1] and len(lines[-1]) + len(code) > width) else []
+                lines[-1] += f'{code}|'
+            lines[-1] = lines[-1].removesuffix('|')
+            return f'{name} = tuple((\n' + ''.join(f'    {line!r}\n' for line in lines) + ").split('|'))\n"
+        file.write_text(f"#!/usr/bin/env python3\n\n'''{isocodes.__doc__}'''\n\n{table('COUNTRIES', cls.isocodes('countries'))}\n{table('LANGUAGES', cls.isocodes('languages'))}")
 
-    @classmethod
-    def languages(cls) -> list[str]:
-        '''Return list of ISO 639-1 2-letter language codes.'''
-        return cls.isocodes('languages')
+    @staticmethod
+    def countries() -> tuple[str]:
+        '''Return ISO 3166-1 country names.'''
+        return isocodes.COUNTRIES
+
+    @staticmethod
+    def languages() -> tuple[str]:
+        '''Return ISO 639-1 2-letter language codes.'''
+        return isocodes.LANGUAGES
 
 
 class StrEnum(str, enum.Enum):
@@ -160,13 +247,29 @@ class StrEnum(str, enum.Enum):
         return sorted(enum.value for enum in cls)
 
 
+class LazyStrEnum:
+    '''Class attribute which builds a `StrEnum` from `values()` on first access and then replaces itself with it, so that large enums cost nothing on import.'''
+
+    def __init__(self, name: str, values: typing.Callable[[], typing.Iterable[str]]):
+        self.name, self.values, self.lock = name, values, threading.Lock()
+
+    def __set_name__(self, owner: type, attr: str):
+        self.attr = attr
+
+    def __get__(self, instance: typing.Any, owner: type) -> StrEnum:
+        with self.lock:
+            if isinstance(owner.__dict__.get(self.attr), LazyStrEnum):
+                setattr(owner, self.attr, StrEnum(self.name, {_.upper(): _ for _ in self.values()}))
+        return owner.__dict__[self.attr]
+
+
 class Type:
 
-    @pydantic.validate_call
+    @Validate.call
     def csv_tags(tags: typing.Iterable[int|str]) -> str:
         return ','.join(str(item).replace(',', '') for item in tags)
 
-    @pydantic.validate_call
+    @Validate.call
     def datetime_to_timestamp(val: int|float|str|datetime.datetime|None) -> int:
         '''Parse `val` into UTC unix timestamp.'''
         if not val:
@@ -174,8 +277,9 @@ class Type:
         if isinstance(val, (int, float)):
             return int(val)
         if isinstance(val, str):
-            Validate.kwargs(check=dateparser.parse(val), message=f"Unable to parse '{val}' as a `datetime` object")
-            val = dateparser.parse(val) if dateparser.parse(val).tzinfo else dateparser.parse(f'{val} UTC')
+            parsed = models.parseDateTime(val)
+            Validate.kwargs(check=parsed, message=f"Unable to parse '{val}' as a `datetime` object")
+            val = parsed
         return int(val.timestamp())
 
     def PosInt(max: int = None) -> typing_extensions._AnnotatedAlias:
@@ -191,14 +295,14 @@ class Type:
     limit = pydantic.types.conint(ge=1, le=1000)
     page = pydantic.types.conint(ge=1, le=1000000)
 
-    bools = pydantic.types.conlist(item_type=bool, min_length=1, max_length=50)
+    bools = pydantic.types.conlist(item_type=typing.Optional[bool], min_length=1, max_length=50)
     datetimes = pydantic.types.conlist(item_type=datetime, min_length=1, max_length=50)
-    ints = pydantic.types.conlist(item_type=int, min_length=1, max_length=50)
-    strs = pydantic.types.conlist(item_type=str, min_length=1, max_length=50)
-    uuids = pydantic.types.conlist(item_type=uuid.UUID, min_length=1, max_length=50)
+    ints = pydantic.types.conlist(item_type=typing.Optional[int], min_length=1, max_length=50)
+    strs = pydantic.types.conlist(item_type=typing.Optional[str], min_length=1, max_length=50)
+    uuids = pydantic.types.conlist(item_type=typing.Optional[uuid.UUID], min_length=1, max_length=50)
 
-    country = StrEnum('Country', {_.upper(): _ for _ in ISOcodes.countries()})
-    language = StrEnum('Language', {_.upper(): _ for _ in ISOcodes.languages()})
+    country = LazyStrEnum('Country', ISOcodes.countries)
+    language = LazyStrEnum('Language', ISOcodes.languages)
     period = StrEnum('Period', {_.upper(): _ for _ in ('overall', '7day', '1month', '3month', '6month', '12month')})
     taggingtype = StrEnum('TaggingType', {_.upper(): _ for _ in ('artist', 'album', 'track')})
 
@@ -253,68 +357,783 @@ class Errors(enum.IntEnum):
     RATE_LIMIT_EXCEEDED = (29, "Rate Limit Exceded - Your IP has made too many requests in a short period, exceeding our API guidelines")
 
 
+@dataclasses.dataclass
+class Retry:
+    '''Retry policy for transient failures (identified by their `Errors` code or HTTP status): exponential backoff with full jitter, honouring the `Retry-After` header and giving up once the total time `budget` would be exceeded.'''
+    # [Exponential Backoff And Jitter](https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/)
+    errors: typing.ClassVar[frozenset[Errors]] = frozenset({Errors.OPERATION_FAILED, Errors.SERVICE_OFFLINE, Errors.TEMPORARY_ERROR, Errors.RATE_LIMIT_EXCEEDED})
+    status: typing.ClassVar[frozenset[int]] = frozenset({429, 500, 502, 503, 504})
+    base: typing.ClassVar[float] = 1.0
+    cap: typing.ClassVar[float] = 60.0
+    budget: typing.ClassVar[float] = 300.0
+    unsent: typing.ClassVar[tuple[type[httpx.TransportError], ...]] = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+    idempotent: bool = True
+    enabled: bool = True
+    attempt: int = 0
+    start: float = dataclasses.field(default_factory=time.monotonic)
+
+    @staticmethod
+    def after(retry_after: str) -> float:
+        '''Parse the `Retry-After` header, given either in seconds or as an HTTP date, into seconds.'''
+        if retry_after.isdigit():
+            return float(retry_after)
+        try:
+            return (email.utils.parsedate_to_datetime(retry_after) - datetime.datetime.now(tz=datetime.timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return 0.0
+
+    def delay(self, error: int = None, status: int = None, retry_after: str = None, transient: bool = False, sent: bool = True) -> float|None:
+        '''Return how long to wait before retrying a request which failed with Last.fm `error` code or HTTP `status`, or `None` if it should not be retried.'''
+        if not (self.enabled and (transient or (error in self.errors) or (status in self.status))):
+            return
+        if not (self.idempotent or not sent or (error == Errors.RATE_LIMIT_EXCEEDED) or (status == 429)): # a POST may have been applied before failing
+            return
+        delay = random.uniform(0, min(self.cap, self.base * 2**self.attempt))
+        if retry_after:
+            delay = max(delay, self.after(retry_after))
+        if (time.monotonic() - self.start + delay) > self.budget:
+            logging.error(f'giving up after {self.attempt+1} attempts: retry budget of {self.budget}s exhausted')
+            return
+        self.attempt += 1
+        logging.warning(f'retrying in {delay:.1f}s (attempt {self.attempt+1})')
+        return delay
+
+
+@dataclasses.dataclass
+class RateLimit:
+    '''Token bucket which refills at `1/Request.sleep` tokens per second. Its state lives in a lock file, so every thread, coroutine and process on this host draws from the same request budget.'''
+    burst: float = 5.0
+    path: pathlib.Path = pathlib.Path(os.getenv('LASTFM_RATELIMIT_FILE', f'{tempfile.gettempdir()}/lastfm-ratelimit'))
+    _state: typing.ClassVar[bytes] = b''
+    _lock: typing.ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def take(cls, state: bytes) -> tuple[bytes, float]:
+        '''Refill the bucket described by `state` (tokens, unix time of the last update), take one token from it, and return the new state along with how long the caller has to wait for that token.'''
+        rate = 1/Request.sleep
+        now = time.time()
+        tokens, last = struct.unpack('dd', state) if (len(state) == 16) else (cls.burst, now)
+        tokens = min(cls.burst, tokens + (now - last) * rate) - 1
+        return struct.pack('dd', tokens, now), max(0.0, -tokens / rate)
+
+    @classmethod
+    def reserve(cls) -> float:
+        '''Reserve one token from the shared bucket and return the delay (in seconds) before the reserved request may be sent.'''
+        with cls._lock:
+            if fcntl is None:
+                cls._state, wait = cls.take(cls._state)
+                return wait
+            fd = os.open(cls.path, os.O_RDWR | os.O_CREAT, 0o666)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                state, wait = cls.take(os.pread(fd, 16, 0))
+                os.pwrite(fd, state, 0)
+            finally:
+                os.close(fd) # also releases the `flock`
+        if wait:
+            logging.debug('rate limit: waiting %.3fs', wait)
+            metrics.REGISTRY.inc('api_ratelimit_wait_seconds_total', wait, client='lastfm')
+        return wait
+
+    @classmethod
+    def acquire(cls) -> None:
+        '''Block until a token is available.'''
+        time.sleep(cls.reserve())
+
+    @classmethod
+    async def aacquire(cls) -> None:
+        '''Wait asynchronously until a token is available.'''
+        await asyncio.sleep(cls.reserve())
+
+
+@dataclasses.dataclass
+class Cache:
+    '''Persistent SQLite cache of JSON responses to unsigned GET requests, keyed on the method and its canonicalized parameters (excluding `api_key`), which expire after a per-method time-to-live.'''
+    path: pathlib.Path = pathlib.Path(os.getenv('LASTFM_CACHE_PATH', '~/.cache/lastfm/responses.sqlite')).expanduser()
+    enabled: bool = os.getenv('LASTFM_CACHE', '1') != '0'
+    ttl: typing.ClassVar[dict[str, datetime.timedelta]] = { # exact method names take precedence over their package
+        'album': datetime.timedelta(days=7),
+        'album.getInfo': datetime.timedelta(days=30),
+        'artist': datetime.timedelta(days=7),
+        'artist.getCorrection': datetime.timedelta(days=30),
+        'artist.getInfo': datetime.timedelta(days=30),
+        'chart': datetime.timedelta(hours=1),
+        'geo': datetime.timedelta(days=1),
+        'library': datetime.timedelta(hours=1),
+        'tag': datetime.timedelta(days=7),
+        'tag.getInfo': datetime.timedelta(days=30),
+        'track': datetime.timedelta(days=7),
+        'track.getCorrection': datetime.timedelta(days=30),
+        'user': datetime.timedelta(minutes=10),
+        'user.getRecentTracks': datetime.timedelta(minutes=1),
+        'user.getInfo': datetime.timedelta(minutes=1),
+        }
+    _local: typing.ClassVar[threading.local] = threading.local()
+
+    @classmethod
+    def connection(cls) -> sqlite3.Connection:
+        '''Return this thread's connection to the cache database, creating the database on first use.'''
+        if not hasattr(cls._local, 'connection'):
+            cls.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(cls.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL') # [Write-Ahead Logging](https://www.sqlite.org/wal.html) lets concurrent processes read while one writes
+            connection.execute('CREATE TABLE IF NOT EXISTS response (key TEXT PRIMARY KEY, method TEXT, expires REAL, json TEXT)')
+            cls._local.connection = connection
+        return cls._local.connection
+
+    @classmethod
+    def expiry(cls, method: str) -> float:
+        '''Return the time-to-live (in seconds) of responses to `method`.'''
+        ttl = cls.ttl.get(method, cls.ttl.get(method.split('.')[0], datetime.timedelta()))
+        return ttl.total_seconds()
+
+    @staticmethod
+    def canonical(**kwargs) -> str:
+        '''Canonicalize the parameters of a request (excluding `api_key`) into a hash.'''
+        params = sorted((key.lower(), str(val)) for key, val in kwargs.items() if (val is not None) and (key != 'api_key'))
+        return hashlib.sha1(json.dumps(params).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def key(cls, **kwargs) -> str|None:
+        '''Canonicalize the parameters of a GET request (and the API root, e.g. a `standin.StandIn`) into a cache key, or return `None` if its response should not be cached.'''
+        if (not cls.enabled) or Cassette.mode or (FORMAT != 'json') or kwargs.get('api_sig') or (not cls.expiry(kwargs.get('method', ''))): # cassettes record and replay the API itself
+            return
+        return cls.canonical(root=Request.url, **kwargs)
+
+    @classmethod
+    def load(cls, key: str) -> Type.json|None:
+        '''Return the cached response for `key` if it has not expired.'''
+        row = cls.connection().execute('SELECT json FROM response WHERE (key = ?) AND (expires > ?)', (key, time.time())).fetchone()
+        metrics.REGISTRY.inc('api_cache_requests_total', client='lastfm', result=('hit' if row else 'miss'))
+        if row:
+            logging.debug('cache hit: %s', key)
+            return decoder.loads(row[0])
+
+    @classmethod
+    def store(cls, key: str, method: str, response: Type.json) -> None:
+        '''Cache `response` under `key` unless it is empty or an error.'''
+        if (not response) or ('error' in response):
+            return
+        cls.connection().execute('INSERT OR REPLACE INTO response VALUES (?, ?, ?, ?)', (key, method, time.time() + cls.expiry(method), json.dumps(response)))
+
+    @classmethod
+    def clear(cls, expired: bool = True) -> None:
+        '''Delete expired responses from the cache (or all of them if `expired` is `False`).'''
+        cls.connection().execute('DELETE FROM response WHERE expires <= ?', (time.time() if expired else float('inf'),))
+
+
+@dataclasses.dataclass
+class Corrections:
+    '''Persistent SQLite index of artist and track name corrections, learnt from `getCorrection` and autocorrected `getInfo` responses.'''
+    path: pathlib.Path = pathlib.Path(os.getenv('LASTFM_CORRECTIONS_PATH', '~/.cache/lastfm/corrections.sqlite')).expanduser()
+    enabled: bool = os.getenv('LASTFM_CORRECTIONS', '1') != '0'
+    columns: typing.ClassVar[tuple[str, ...]] = ('artist_name', 'artist_mbid', 'artist_url', 'track_name', 'track_mbid', 'track_url')
+    _local: typing.ClassVar[threading.local] = threading.local()
+
+    @classmethod
+    def connection(cls) -> sqlite3.Connection:
+        '''Return this thread's connection to the index, creating it on first use.'''
+        if not hasattr(cls._local, 'connection'):
+            cls.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(cls.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(f"CREATE TABLE IF NOT EXISTS correction (artist TEXT, track TEXT, {', '.join(cls.columns)}, PRIMARY KEY (artist, track))") # `track` is '' for artist corrections
+            cls._local.connection = connection
+        return cls._local.connection
+
+    @staticmethod
+    def fold(name: typing.Any) -> str:
+        '''Normalize a raw name into a key of the index (casefolded, with collapsed whitespace).'''
+        return ' '.join(str(name or '').split()).casefold()
+
+    @classmethod
+    def lookup(cls, artist: str, track: str = None) -> dict[str, str]|None:
+        '''Return the correction of `artist` (and `track`), if known.'''
+        row = cls.connection().execute(f"SELECT {', '.join(cls.columns)} FROM correction WHERE (artist = ?) AND (track = ?)", (cls.fold(artist), cls.fold(track))).fetchone()
+        return dict(zip(cls.columns, row)) if row else None
+
+    @classmethod
+    def add(cls, artist: str, track: str = None, **correction: str) -> None:
+        '''Record the `correction` (keyed by `columns`) of `artist` (and `track`).'''
+        values = [str(correction.get(column) or '') for column in cls.columns]
+        cls.connection().execute(f"INSERT OR REPLACE INTO correction VALUES (?, ?, {', '.join('?' for _ in cls.columns)})", (cls.fold(artist), cls.fold(track), *values))
+
+    @classmethod
+    def active(cls) -> bool:
+        '''Whether the index is used (not while `Cassette` records or replays, whose requests must carry the names as given).'''
+        return cls.enabled and not Cassette.mode
+
+    @staticmethod
+    def applies(**kwargs) -> bool:
+        '''Whether the names passed to a request may be corrected (not for signed requests, whose `api_sig` covers the names as given).'''
+        method = kwargs.get('method') or ''
+        if kwargs.get('api_sig'): # not `sk`, which unsigned reads also carry (see `Auth.user`)
+            return False
+        return method.split('.')[0] in ('album', 'artist', 'track') and not method.endswith(('.getCorrection', '.search')) and not kwargs.get('mbid') and (kwargs.get('autocorrect') not in (False, 0, '0'))
+
+    @classmethod
+    def correct(cls, **kwargs) -> dict[str, typing.Any]:
+        '''Replace the `artist` (and `track`) names in the parameters of a request by their known canonical names.'''
+        if not (cls.active() and kwargs.get('artist') and cls.applies(**kwargs)):
+            return kwargs
+        correction = (kwargs.get('track') and cls.lookup(kwargs['artist'], kwargs['track'])) or cls.lookup(kwargs['artist'])
+        if correction:
+            logging.debug('corrected: %s', correction)
+            kwargs = kwargs | {'artist': correction['artist_name'] or kwargs['artist']} | ({'track': correction['track_name']} if correction['track_name'] else {})
+        return kwargs
+
+    @classmethod
+    def respond(cls, **kwargs) -> Type.json|None:
+        '''Answer an `artist.getCorrection` or `track.getCorrection` request from the index, if possible.'''
+        method = kwargs.get('method')
+        if not (cls.active() and (method in ('artist.getCorrection', 'track.getCorrection'))):
+            return
+        correction = cls.lookup(kwargs.get('artist'), kwargs.get('track') if method == 'track.getCorrection' else None)
+        if not (correction and correction['artist_url'] and (correction['track_url'] or (method == 'artist.getCorrection'))):
+            return
+        artist = {'name': correction['artist_name'], 'mbid': correction['artist_mbid'], 'url': correction['artist_url']}
+        if method == 'artist.getCorrection':
+            return {'corrections': {'correction': {'artist': artist, '@attr': {'index': '0'}}}}
+        corrected = {'artistcorrected': str(int(correction['artist_name'] != kwargs.get('artist'))), 'trackcorrected': str(int(correction['track_name'] != kwargs.get('track')))}
+        track = {'name': correction['track_name'], 'mbid': correction['track_mbid'], 'url': correction['track_url'], 'artist': artist}
+        return {'corrections': {'correction': {'track': track, '@attr': {'index': '0', **corrected}}}}
+
+    @classmethod
+    def learn(cls, response: Type.json, **kwargs) -> None:
+        '''Record the correction carried by the `response` to a request with (raw) parameters `kwargs`, if any.'''
+        method, artist = kwargs.get('method'), kwargs.get('artist')
+        if not (cls.active() and artist and isinstance(response, dict)) or ('error' in response):
+            return
+        if method in ('artist.getCorrection', 'track.getCorrection'):
+            correction = response.get('corrections')
+            entity = correction.get('correction', {}) if isinstance(correction, dict) else {} # no correction: `{"corrections": "\n  "}`
+            entity = entity.get('artist') or entity.get('track')
+        elif kwargs.get('autocorrect') and (method in ('artist.getInfo', 'track.getInfo')):
+            entity = response.get(method.split('.')[0])
+        elif kwargs.get('autocorrect') and (method == 'album.getInfo'): # `autocorrect` only affects the artist, whose name is all the response carries
+            entity = {'name': (response.get('album') or {}).get('artist')} if not cls.lookup(artist) else None
+        else:
+            return
+        if not isinstance(entity, dict) or not entity.get('name'):
+            return
+        if 'artist' not in entity: # an artist
+            return cls.add(artist, artist_name=entity.get('name'), artist_mbid=entity.get('mbid'), artist_url=entity.get('url'))
+        if kwargs.get('track'):
+            cls.add(artist, kwargs.get('track'), artist_name=entity['artist'].get('name'), artist_mbid=entity['artist'].get('mbid'), artist_url=entity['artist'].get('url'), track_name=entity.get('name'), track_mbid=entity.get('mbid'), track_url=entity.get('url'))
+        if entity['artist'].get('name') and not cls.lookup(artist): # a track correction also corrects its artist
+            cls.add(artist, artist_name=entity['artist'].get('name'), artist_mbid=entity['artist'].get('mbid'), artist_url=entity['artist'].get('url'))
+
+    @classmethod
+    def clear(cls) -> None:
+        cls.connection().execute('DELETE FROM correction')
+
+
+@dataclasses.dataclass
+class Cassette:
+    '''Record API responses to cassette files (one per canonicalized request, without credentials) and replay them with a fixed `latency` instead of calling the API.'''
+    path: pathlib.Path = pathlib.Path(os.getenv('LASTFM_CASSETTE_PATH', pathlib.Path(__file__).parent / 'cassettes')).expanduser()
+    mode: str = os.getenv('LASTFM_CASSETTE')
+    latency: float = float(os.getenv('LASTFM_CASSETTE_LATENCY', '0')) # seconds
+    modes: typing.ClassVar[tuple[str, ...]] = ('record', 'replay', 'auto') # always call the API, never call it, or replay if recorded and else record (`None` disables cassettes)
+    unsigned: typing.ClassVar[frozenset[str]] = frozenset({'api_sig', 'sk'}) # differ between accounts
+
+    @classmethod
+    @contextlib.contextmanager
+    def use(cls, mode: str = 'replay', path: pathlib.Path|str = None, latency: float = None) -> typing.Iterator[type[Cassette]]:
+        '''Record or replay cassettes (see `Cassette`) within a `with` block.'''
+        Validate.kwargs(check=(mode in (*cls.modes, None)), message=f'`mode` must be one of {cls.modes} or None')
+        previous = cls.mode, cls.path, cls.latency
+        cls.mode, cls.path, cls.latency = mode, (pathlib.Path(path) if path else cls.path), (cls.latency if latency is None else latency)
+        try:
+            yield cls
+        finally:
+            cls.mode, cls.path, cls.latency = previous
+
+    @classmethod
+    def file(cls, request: httpx.Request) -> pathlib.Path:
+        '''Return the cassette file of `request`, named after its API method and keyed on its canonicalized parameters (and form data).'''
+        params = dict(request.url.params) | dict(urllib.parse.parse_qsl(request.content.decode('utf-8')))
+        key = Cache.canonical(http_method=request.method, **{key: val for key, val in params.items() if key not in cls.unsigned})
+        return cls.path / f"{params.get('method', 'unknown')}.{key}.json"
+
+    @classmethod
+    def load(cls, request: httpx.Request) -> httpx.Response|None:
+        '''Return the recorded response to `request`, or `None` if it should be sent to the API.'''
+        if cls.mode not in ('replay', 'auto'):
+            return
+        file = cls.file(request)
+        if not file.exists():
+            if cls.mode == 'replay':
+                raise FileNotFoundError(f'no cassette for {request.method} {request.url} (record it with `LASTFM_CASSETTE=record`): {file}')
+            return
+        cassette = json.loads(file.read_bytes())
+        return httpx.Response(status_code=cassette['status'], headers=cassette['headers'], content=cassette['content'].encode('utf-8'), request=request)
+
+    @classmethod
+    def replays(cls, request: httpx.Request) -> bool:
+        '''Whether `request` is answered from a cassette (whose recorded failures are final, so `Retry` is disabled).'''
+        return (cls.mode == 'replay') or ((cls.mode == 'auto') and cls.file(request).exists())
+
+    @staticmethod
+    def transient(response: httpx.Response) -> bool:
+        '''Whether `response` is a failure which `Retry` would retry, and which is therefore not recorded.'''
+        if response.status_code in Retry.status:
+            return True
+        error = re.search(rb'"error"\s*:\s*(\d+)|<error code="(\d+)"', response.content[:256]) if len(response.content) < 1024 else None # error responses are short and lead with their code
+        return bool(error) and (int(error.group(1) or error.group(2)) in Retry.errors)
+
+    @classmethod
+    def replay(cls, request: httpx.Request) -> httpx.Response|None:
+        '''Return the recorded response to `request` after `latency`, if any (see `load`).'''
+        response = cls.load(request)
+        if (response is not None) and cls.latency:
+            time.sleep(cls.latency)
+        return response
+
+    @classmethod
+    async def areplay(cls, request: httpx.Request) -> httpx.Response|None:
+        '''Asynchronous counterpart of `replay`.'''
+        response = cls.load(request)
+        if (response is not None) and cls.latency:
+            await asyncio.sleep(cls.latency)
+        return response
+
+    @classmethod
+    def record(cls, request: httpx.Request, response: httpx.Response) -> None:
+        '''Write `response` to the cassette file of `request` (reading the body of a streamed response first).'''
+        if cls.mode not in ('record', 'auto'):
+            return
+        response.read()
+        if cls.transient(response):
+            return logging.debug(f'not recorded: {response.status_code} | {request.url}')
+        file = cls.file(request)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        cassette = dict(status=response.status_code, headers={key: val for key, val in response.headers.items() if key in ('content-type', 'retry-after')}, content=response.content.decode('utf-8'))
+        part = file.with_suffix('.json.part')
+        part.write_text(json.dumps(cassette, ensure_ascii=False, indent=1))
+        part.replace(file) # atomic, so that concurrent replays never read a partial cassette
+        logging.debug(f'recorded: {file}')
+
+
+@dataclasses.dataclass
+class SingleFlight:
+    '''Coalesce concurrent identical GET requests into one upstream call whose result (or exception) every caller shares.'''
+    enabled: bool = os.getenv('LASTFM_SINGLEFLIGHT', '1') != '0'
+    _calls: typing.ClassVar[dict[str, concurrent.futures.Future]] = {}
+    _lock: typing.ClassVar[threading.Lock] = threading.Lock()
+    _tasks: typing.ClassVar[weakref.WeakKeyDictionary] = weakref.WeakKeyDictionary() # per event loop
+
+    @staticmethod
+    def key(mode: str = None, fields: typing.Iterable[str] = None, **kwargs) -> str:
+        '''Canonicalize a GET request, including how its response is parsed.'''
+        return Cache.canonical(mode=(mode or Validate.mode), fields=(tuple(fields) if fields else None), **kwargs)
+
+    @classmethod
+    def call(cls, key: str, function: typing.Callable[[], typing.Any]) -> typing.Any:
+        '''Return the result of `function()`, sharing it with every concurrent caller of `key` across threads.'''
+        if not cls.enabled:
+            return function()
+        with cls._lock:
+            future, leader = cls._calls.get(key), False
+            if future is None:
+                future, leader = cls._calls.setdefault(key, concurrent.futures.Future()), True
+        if not leader:
+            logging.debug('coalesced: %s', key)
+            metrics.REGISTRY.inc('api_coalesced_total', client='lastfm')
+            return future.result()
+        try:
+            future.set_result(function())
+        except BaseException as error:
+            future.set_exception(error)
+        finally:
+            with cls._lock:
+                del cls._calls[key]
+        return future.result()
+
+    @classmethod
+    async def acall(cls, key: str, function: typing.Callable[[], typing.Awaitable]) -> typing.Any:
+        '''Await the result of `function()`, sharing it with every concurrent caller of `key` on the current event loop.'''
+        if not cls.enabled:
+            return await function()
+        tasks = cls._tasks.setdefault(asyncio.get_running_loop(), {})
+        if key in tasks:
+            logging.debug('coalesced: %s', key)
+            metrics.REGISTRY.inc('api_coalesced_total', client='lastfm')
+        else:
+            tasks[key] = asyncio.ensure_future(function())
+            tasks[key].add_done_callback(lambda task: tasks.pop(key, None))
+        return await asyncio.shield(tasks[key]) # cancelling one caller does not cancel the request shared with the others
+
+
 @dataclasses.dataclass
 class Request:
     url: str = 'http://ws.audioscrobbler.com/2.0/'
     sleep: float = 0.2 # [Rate limit copied from pylast since it is not explicitly mentioned in the API Terms of Service](https://github.com/pylast/pylast/blob/master/src/pylast/__init__.py#L119)
+    timeout: float = 60.0
+    max_connections: int = 10
+    keepalive_expiry: float = 30.0
+    _client: typing.ClassVar[httpx.Client] = None
+    _lock: typing.ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def client(cls) -> httpx.Client:
+        '''Return the `httpx.Client` shared by every API method, which keeps a pool of keep-alive connections open and decodes gzip-compressed responses as they stream in.'''
+        # [httpx | Connection Pooling](https://www.python-httpx.org/advanced/clients/#why-use-a-client)
+        if cls._client is None:
+            with cls._lock:
+                if cls._client is None:
+                    limits = httpx.Limits(max_connections=cls.max_connections, max_keepalive_connections=cls.max_connections, keepalive_expiry=cls.keepalive_expiry)
+                    cls._client = httpx.Client(headers=HEADERS, timeout=cls.timeout, limits=limits)
+                    atexit.register(cls._client.close)
+        return cls._client
 
     @classmethod
-    def request(cls, request_method: str, data: Type.json = None, **kwargs) -> urllib.request.Request:
-        '''Instantiate a `urllib.request.Request` of given `request_method` with url parameters given by `kwargs` dictionary.'''
+    def request(cls, request_method: str, data: Type.json = None, format: str = FORMAT, **kwargs) -> httpx.Request:
+        '''Instantiate an `httpx.Request` of given `request_method` with url parameters given by `kwargs` dictionary.'''
         kwargs = {key.lower(): val for key, val in kwargs.items() if val is not None}
-        params = {**kwargs, 'format': FORMAT}
-        logging.debug(params)
+        params = {**kwargs, 'format': format}
+        logging.debug('%s', params)
         url = urllib.parse.urlparse(url=f'{cls.url}?{urllib.parse.urlencode(query=params)}')
         data = urllib.parse.urlencode(data).encode('utf-8') if data else None
-        return urllib.request.Request(method=request_method, url=urllib.parse.urlunparse(url), headers=HEADERS, data=data)
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'} if data else None
+        return cls.client().build_request(method=request_method, url=urllib.parse.urlunparse(url), headers=headers, content=data)
 
     @staticmethod
     def error(response: Type.json):
         logging.error(f"{response['message'] = }")
+        metrics.REGISTRY.inc('api_errors_total', client='lastfm', code=response.get('error'))
         if response.get('error') in {e.value for e in Errors}:
             error_enum = Errors(response.get('error'))
             logging.error(f"{error_enum.name}: {error_enum.__doc__}")
 
     @classmethod
-    def urlopen(cls, request: urllib.request.Request) -> Type.json|xml.etree.ElementTree.Element:
-        '''Fetch response for `request`.'''
-        with urllib.request.urlopen(url=request) as response:
-            logging.info(f'HTTP Request: {request.method} | {response.status} | {request.full_url}')
-            if FORMAT != 'json':
-                return xml.etree.ElementTree.fromstring(response.read())
-            response = json.loads(response.read().decode('utf-8'))
+    def urlopen(cls, request: httpx.Request) -> Type.json|xml.etree.ElementTree.Element:
+        '''Fetch response for `request` through the shared connection pool once `RateLimit` allows it (or replay it from a `Cassette`).'''
+        response = Cassette.replay(request)
+        if response is None:
+            RateLimit.acquire()
+            with metrics.REGISTRY.time('api_request_duration_seconds', client='lastfm', method=request.url.params.get('method')):
+                response = cls.client().send(request=request)
+            metrics.REGISTRY.inc('api_response_bytes_total', len(response.content), client='lastfm', method=request.url.params.get('method'))
+            Cassette.record(request, response)
+        logging.info('HTTP Request: %s | %s | %s', request.method, response.status_code, request.url)
+        response.raise_for_status()
+        if FORMAT != 'json':
+            return xml.etree.ElementTree.fromstring(response.content)
+        response = decoder.loads(response.content)
         if response.get('error'):
             cls.error(response)
         return response
 
     @classmethod
-    def response(cls, request: urllib.request.Request) -> Type.json|xml.etree.ElementTree.Element:
-        '''Fetch response for `request` and handle exceptions.'''
-        try:
-            return cls.urlopen(request=request)
-        except json.JSONDecodeError as error:
-            logging.error(f'json.JSONDecodeError: {error}')
-        except urllib.error.HTTPError as http_error:
-            logging.error(f'{http_error.status} | {http_error.reason} | {http_error.url} | {dict(http_error.headers)}')
-            if not ('json' in http_error.headers.get('Content-Type', '')):
-                return
-            error = json.loads(http_error.read().decode('utf-8'))
-            cls.error(error)
-            return error
-
-    @classmethod
-    def get(cls, format: str = FORMAT, **kwargs) -> Type.response:
-        '''Wrapper function for `urllib.request.urlopen` GET requests which accepts URL parameters from `kwargs`.'''
-        request = cls.request(request_method='GET', **kwargs)
-        response = cls.response(request=request)
-        return Validate.response(response=response, method=kwargs.get('method'), limit=kwargs.get('limit')) if VALIDATE_RESPONSE else response
+    def httperror(cls, http_error: httpx.HTTPStatusError) -> Type.json|None:
+        '''Log `http_error` and return its JSON body, if any.'''
+        response = http_error.response
+        logging.error(f'{response.status_code} | {response.reason_phrase} | {response.url} | {dict(response.headers)}')
+        metrics.REGISTRY.inc('api_http_errors_total', client='lastfm', status=response.status_code)
+        if not ('json' in response.headers.get('Content-Type', '')):
+            return
+        error = decoder.loads(response.content)
+        cls.error(error)
+        return error
+
+    @classmethod
+    def response(cls, request: httpx.Request) -> Type.json|xml.etree.ElementTree.Element:
+        '''Fetch response for `request`, retry transient failures according to `Retry`, and handle exceptions.'''
+        retry = Retry(idempotent=(request.method != 'POST'), enabled=not Cassette.replays(request))
+        while True:
+            try:
+                response = cls.urlopen(request=request)
+                delay = retry.delay(error=response.get('error')) if isinstance(response, dict) else None
+            except json.JSONDecodeError as error:
+                return logging.error(f'json.JSONDecodeError: {error}')
+            except httpx.TransportError as error:
+                logging.error(f'{type(error).__name__}: {error} | {request.url}')
+                response, delay = None, retry.delay(transient=True, sent=not isinstance(error, Retry.unsent))
+                if delay is None:
+                    raise
+            except httpx.HTTPStatusError as http_error:
+                response = cls.httperror(http_error=http_error)
+                delay = retry.delay(error=(response or {}).get('error'), status=http_error.response.status_code, retry_after=http_error.response.headers.get('Retry-After'))
+            if delay is None:
+                return response
+            metrics.REGISTRY.inc('api_retries_total', client='lastfm', method=request.url.params.get('method'))
+            time.sleep(delay)
 
     @classmethod
-    def post(cls, data: Type.json = None, **kwargs) -> Type.response:
-        '''Wrapper function for `urllib.request.urlopen` POST requests which accepts URL parameters from `kwargs`.'''
+    def get(cls, format: str = FORMAT, mode: str = None, fields: typing.Iterable[str] = None, **kwargs) -> Type.response:
+        '''Wrapper function for GET requests through the shared `httpx.Client` which accepts URL parameters from `kwargs` (see `Validate.response` for `mode` and `fields`); with `format='xml'` the response is streamed and its items are yielded as they are parsed (see `XML.items`).'''
+        if format == 'xml':
+            return XML.items(mode=mode, **kwargs)
+        if ASYNC.get():
+            return AsyncRequest.get(format=format, mode=mode, fields=fields, **kwargs)
+        return SingleFlight.call(SingleFlight.key(mode=mode, fields=fields, **kwargs), functools.partial(cls.fetch, mode=mode, fields=fields, **kwargs))
+
+    @classmethod
+    def fetch(cls, mode: str = None, fields: typing.Iterable[str] = None, **kwargs) -> Type.response:
+        '''Fetch (from `Corrections` or `Cache` if possible) and parse the response to a GET request, with names corrected by `Corrections`.'''
+        raw, kwargs = kwargs, Corrections.correct(**kwargs)
+        key = Cache.key(**kwargs)
+        response = Corrections.respond(**raw) or (Cache.load(key) if key else None)
+        if response is None:
+            request = cls.request(request_method='GET', **kwargs)
+            response = cls.response(request=request)
+            Corrections.learn(response, **raw)
+            if key:
+                Cache.store(key=key, method=kwargs.get('method'), response=response)
+        return Validate.response(response=response, method=kwargs.get('method'), limit=kwargs.get('limit'), mode=mode, fields=fields) if VALIDATE_RESPONSE else response
+
+    @classmethod
+    def post(cls, data: Type.json = None, mode: str = None, **kwargs) -> Type.response:
+        '''Wrapper function for POST requests through the shared `httpx.Client` which accepts URL parameters from `kwargs` (see `Validate.response` for `mode`).'''
+        if ASYNC.get():
+            return AsyncRequest.post(data=data, mode=mode, **kwargs)
         request = cls.request(request_method='POST', data=data, **kwargs)
         response = cls.response(request=request)
-        return Validate.response(response=response, method=kwargs.get('method')) if VALIDATE_RESPONSE else response
+        return Validate.response(response=response, method=kwargs.get('method'), mode=mode) if VALIDATE_RESPONSE else response
+
+
+class AsyncRequest(Request):
+    '''Asynchronous counterpart of `Request`, sending requests through one `httpx.AsyncClient` shared per event loop.'''
+    _clients: typing.ClassVar[weakref.WeakKeyDictionary] = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def client(cls) -> httpx.AsyncClient:
+        '''Return the `httpx.AsyncClient` shared by every coroutine running on the current event loop.'''
+        loop = asyncio.get_running_loop()
+        if loop not in cls._clients:
+            limits = httpx.Limits(max_connections=cls.max_connections, max_keepalive_connections=cls.max_connections, keepalive_expiry=cls.keepalive_expiry)
+            cls._clients[loop] = httpx.AsyncClient(headers=HEADERS, timeout=cls.timeout, limits=limits)
+        return cls._clients[loop]
+
+    @classmethod
+    async def aclose(cls) -> None:
+        '''Close the `httpx.AsyncClient` bound to the current event loop.'''
+        client = cls._clients.pop(asyncio.get_running_loop(), None)
+        if client:
+            await client.aclose()
+
+    @classmethod
+    async def urlopen(cls, request: httpx.Request) -> Type.json|xml.etree.ElementTree.Element:
+        '''Fetch response for `request` through the shared connection pool once `RateLimit` allows it (or replay it from a `Cassette`).'''
+        response = await Cassette.areplay(request)
+        if response is None:
+            await RateLimit.aacquire()
+            with metrics.REGISTRY.time('api_request_duration_seconds', client='lastfm', method=request.url.params.get('method')):
+                response = await cls.client().send(request=request)
+            metrics.REGISTRY.inc('api_response_bytes_total', len(response.content), client='lastfm', method=request.url.params.get('method'))
+            Cassette.record(request, response)
+        logging.info('HTTP Request: %s | %s | %s', request.method, response.status_code, request.url)
+        response.raise_for_status()
+        if FORMAT != 'json':
+            return xml.etree.ElementTree.fromstring(response.content)
+        response = decoder.loads(response.content)
+        if response.get('error'):
+            cls.error(response)
+        return response
+
+    @classmethod
+    async def response(cls, request: httpx.Request) -> Type.json|xml.etree.ElementTree.Element:
+        '''Fetch response for `request`, retry transient failures according to `Retry`, and handle exceptions.'''
+        retry = Retry(idempotent=(request.method != 'POST'), enabled=not Cassette.replays(request))
+        while True:
+            try:
+                response = await cls.urlopen(request=request)
+                delay = retry.delay(error=response.get('error')) if isinstance(response, dict) else None
+            except json.JSONDecodeError as error:
+                return logging.error(f'json.JSONDecodeError: {error}')
+            except httpx.TransportError as error:
+                logging.error(f'{type(error).__name__}: {error} | {request.url}')
+                response, delay = None, retry.delay(transient=True, sent=not isinstance(error, Retry.unsent))
+                if delay is None:
+                    raise
+            except httpx.HTTPStatusError as http_error:
+                response = cls.httperror(http_error=http_error)
+                delay = retry.delay(error=(response or {}).get('error'), status=http_error.response.status_code, retry_after=http_error.response.headers.get('Retry-After'))
+            if delay is None:
+                return response
+            metrics.REGISTRY.inc('api_retries_total', client='lastfm', method=request.url.params.get('method'))
+            await asyncio.sleep(delay)
+
+    @classmethod
+    async def get(cls, format: str = FORMAT, mode: str = None, fields: typing.Iterable[str] = None, **kwargs) -> Type.response:
+        '''Wrapper coroutine for GET requests through the shared `httpx.AsyncClient` which accepts URL parameters from `kwargs` (see `Validate.response` for `mode` and `fields`).'''
+        return await SingleFlight.acall(SingleFlight.key(mode=mode, fields=fields, **kwargs), functools.partial(cls.fetch, mode=mode, fields=fields, **kwargs))
+
+    @classmethod
+    async def fetch(cls, mode: str = None, fields: typing.Iterable[str] = None, **kwargs) -> Type.response:
+        '''Fetch (from `Corrections` or `Cache` if possible) and parse the response to a GET request, with names corrected by `Corrections`.'''
+        raw, kwargs = kwargs, Corrections.correct(**kwargs)
+        key = Cache.key(**kwargs)
+        response = Corrections.respond(**raw) or (Cache.load(key) if key else None)
+        if response is None:
+            request = cls.request(request_method='GET', **kwargs)
+            response = await cls.response(request=request)
+            Corrections.learn(response, **raw)
+            if key:
+                Cache.store(key=key, method=kwargs.get('method'), response=response)
+        return Validate.response(response=response, method=kwargs.get('method'), limit=kwargs.get('limit'), mode=mode, fields=fields) if VALIDATE_RESPONSE else response
+
+    @classmethod
+    async def post(cls, data: Type.json = None, mode: str = None, **kwargs) -> Type.response:
+        '''Wrapper coroutine for POST requests through the shared `httpx.AsyncClient` which accepts URL parameters from `kwargs` (see `Validate.response` for `mode`).'''
+        request = cls.request(request_method='POST', data=data, **kwargs)
+        response = await cls.response(request=request)
+        return Validate.response(response=response, method=kwargs.get('method'), mode=mode) if VALIDATE_RESPONSE else response
+
+    @staticmethod
+    def coroutine(method: typing.Callable) -> typing.Callable:
+        '''Wrap the synchronous API `method` into a coroutine function which validates its arguments identically but awaits the request through `AsyncRequest`.'''
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs) -> Type.response:
+            token = ASYNC.set(True)
+            try:
+                response = method(*args, **kwargs)
+            finally:
+                ASYNC.reset(token)
+            return await response
+        return wrapper
+
+    @classmethod
+    def namespace(cls, namespace: type) -> type:
+        '''Mirror the methods of `namespace` which return `Type.response` as coroutine functions.'''
+        methods = {name: cls.coroutine(method) for name, method in vars(namespace).items() if callable(method) and (method.__annotations__.get('return') == 'Type.response')}
+        return type(namespace.__name__, (), {'__doc__': f'Asynchronous mirror of `{namespace.__name__}`.', **methods})
+
+
+class XML:
+    '''Streaming path for XML responses, which builds each item of a list response into its `models` class as soon as `lxml` has parsed it (without `Cache` or `SingleFlight`, which need the whole body).'''
+
+    @classmethod
+    def convert(cls, element: lxml.etree._Element) -> Type.json|str:
+        '''Convert `element` the way Last.fm derives its JSON responses: attributes of leaves become keys next to `#text`, attributes of other elements are grouped under `@attr`, and repeated children become lists.'''
+        children = list(element)
+        if not children:
+            text = element.text or ''
+            return {**element.attrib, '#text': text} if element.attrib else text
+        data = {'@attr': dict(element.attrib)} if element.attrib else {}
+        for child in children:
+            value = cls.convert(child)
+            if child.tag not in data:
+                data[child.tag] = value
+            elif isinstance(data[child.tag], list):
+                data[child.tag].append(value)
+            else:
+                data[child.tag] = [data[child.tag], value]
+        return data
+
+    @classmethod
+    def listify(cls, model: type[pydantic.BaseModel], data: Type.json) -> Type.json:
+        '''Wrap lone values of the list fields of `model` into lists, since XML cannot tell a single-item list from a single value.'''
+        for name, field in model.model_fields.items():
+            key = field.alias or name
+            if not isinstance(data, dict) or (key not in data):
+                continue
+            members = models.Projection.unwrap(field.annotation)
+            if (typing.get_origin(field.annotation) in (list, typing.List)) and not isinstance(data[key], list):
+                data[key] = [data[key]]
+            for value in (data[key] if isinstance(data[key], list) else [data[key]]):
+                if isinstance(value, dict) and members:
+                    cls.listify(models.Trusted.select(members, value) if (len(members) > 1) else members[0], value)
+        return data
+
+    @classmethod
+    def model(cls, model: type[pydantic.BaseModel], data: Type.json, mode: str, validate: bool) -> pydantic.BaseModel:
+        '''Build `model` from `data`, validating it if `mode` is 'full' (or 'sample' and `validate`).'''
+        if mode == 'full':
+            return model(**cls.listify(model, data))
+        if (mode == 'sample') and validate:
+            model(**cls.listify(model, data))
+        return models.Trusted.construct(model, data)
+
+    @staticmethod
+    def code(response: httpx.Response) -> int|None:
+        '''Return the Last.fm error code in the (short) body of an error `response`, if any.'''
+        import lxml.etree
+        try:
+            return int(lxml.etree.fromstring(response.read()).find('error').get('code'))
+        except (lxml.etree.XMLSyntaxError, AttributeError, TypeError, ValueError):
+            return None
+
+    @classmethod
+    def send(cls, request: httpx.Request) -> httpx.Response:
+        '''Send `request` once `RateLimit` allows it (or replay it from a `Cassette`) without reading its body, retrying transient failures according to `Retry`.'''
+        retry, method = Retry(enabled=not Cassette.replays(request)), request.url.params.get('method')
+        while True:
+            try:
+                response = Cassette.replay(request)
+                if response is None:
+                    RateLimit.acquire()
+                    with metrics.REGISTRY.time('api_request_duration_seconds', client='lastfm', method=method): # until the headers: the body is read as it is parsed
+                        response = Request.client().send(request=request, stream=True)
+                    Cassette.record(request, response)
+                if not response.is_error:
+                    return response
+                delay = retry.delay(error=cls.code(response), status=response.status_code, retry_after=response.headers.get('Retry-After'))
+                if delay is None:
+                    return response
+                response.close()
+            except httpx.TransportError as error:
+                logging.error(f'{type(error).__name__}: {error} | {request.url}')
+                delay = retry.delay(transient=True, sent=not isinstance(error, Retry.unsent))
+                if delay is None:
+                    raise
+            metrics.REGISTRY.inc('api_retries_total', client='lastfm', method=method)
+            time.sleep(delay)
+
+    @classmethod
+    def items(cls, mode: str = None, **kwargs) -> typing.Iterator[pydantic.BaseModel]:
+        '''Stream the XML response of the API `method` given in `kwargs` and yield its items as `models` (validated according to `mode`, see `Validate.response`).'''
+        import lxml.etree
+        mode = mode or Validate.mode
+        Validate.kwargs(check=(mode in ('full', 'sample', 'trusted')), message="`mode` must be one of ('full', 'sample', 'trusted') for XML responses")
+        request = Request.request(request_method='GET', format='xml', **kwargs)
+        response = cls.send(request)
+        with contextlib.closing(response):
+            logging.info('HTTP Request: %s | %s | %s', request.method, response.status_code, request.url)
+            if response.is_error and ('xml' not in response.headers.get('Content-Type', '')):
+                metrics.REGISTRY.inc('api_http_errors_total', client='lastfm', status=response.status_code)
+                return logging.error(f'{response.status_code} | {response.reason_phrase} | {response.url}')
+            parser = lxml.etree.XMLPullParser(events=('start', 'end'), remove_blank_text=True)
+            depth, count = 0, 0
+            for chunk in response.iter_bytes():
+                metrics.REGISTRY.inc('api_response_bytes_total', len(chunk), client='lastfm', method=kwargs.get('method'))
+                parser.feed(chunk)
+                for event, element in parser.read_events():
+                    depth += (event == 'start')
+                    if (event == 'start') and (depth == 2) and (element.tag != 'error'): # `<lfm><entity>`
+                        model = getattr(getattr(models, kwargs.get('method').split('.')[0]), element.tag.capitalize())
+                        keys, members = models.Projection.locate(model)
+                    elif (event == 'end') and (depth == 2) and (element.tag == 'error'):
+                        return Request.error({'error': int(element.get('code')), 'message': element.text})
+                    elif (event == 'end') and (depth == 2) and (not members): # not a list response: yield the whole entity
+                        yield cls.model(model, cls.convert(element), mode=mode, validate=True)
+                    elif (event == 'end') and (depth == 2 + len(keys)) and (element.tag == keys[-1]) and members:
+                        item = cls.convert(element)
+                        element.clear()
+                        while element.getprevious() is not None: # drop the items already yielded
+                            del element.getparent()[0]
+                        member = models.Trusted.select(members, item) if (len(members) > 1) else members[0]
+                        yield cls.model(member, item, mode=mode, validate=(count < Validate.sample))
+                        count += 1
+                    depth -= (event == 'end')
+            parser.close()
+
+
+class Paginate:
+
+    @staticmethod
+    def items(method: typing.Callable, entity: str, page: int = 1, **kwargs) -> typing.Iterator[pydantic.BaseModel]:
+        '''Yield the validated `entity` items from every page of `method`, starting at `page`; the next page is fetched in a background thread while the current one is being consumed, so at most two pages are held in memory.'''
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(contextvars.copy_context().run, method, page=page, **kwargs) # keep e.g. `TRUSTED_ARGUMENTS` in the worker thread
+            while future:
+                response = future.result()
+                if (not response) or isinstance(response, models.Error):
+                    return logging.error(f'stopped paginating {method.__qualname__} at page {page}')
+                future = executor.submit(contextvars.copy_context().run, method, page=page+1, **kwargs) if (page < response.attr.totalPages) else None
+                yield from getattr(response, entity)
+                page += 1
 
 
 @dataclasses.dataclass
@@ -332,10 +1151,9 @@ class Auth:
         # [Last.fm API invalid method signature but valid when getting session key](https://stackoverflow.com/a/45907546/13019084)
         Validate.kwargs(check=cls.secret, message='Please define your last.fm API secret as an environment variables:\nexport LASTFM_SECRET=your_lastfm_secret')
         params = {key: val for key, val in params.items() if val is not None}
-        logging.debug(f"{dict(sorted(params.items()))} + '{cls.secret}'")
+        logging.debug('signing %s', sorted(params)) # keys only: the values include the session key and the signed string includes the secret
         sorted_params = [f'{key}{val}' for key, val in sorted(params.items()) if key not in ('api_sig', 'callback', 'format')]
         api_sig = str.join('', sorted_params) + uuid.UUID(cls.secret).hex
-        logging.debug(f'{api_sig = }')
         api_sig = hashlib.md5(api_sig.encode('utf-8')).hexdigest()
         return uuid.UUID(api_sig).hex
 
@@ -360,14 +1178,14 @@ class Auth:
 
 class album:
 
-    @pydantic.validate_call
+    @Validate.call
     def addTags(artist: str, album: str, tags: Type.tags, api_sig: uuid.UUID = None, sk: str = Auth.session_key, api_key: Type.api_key = API_KEY, method: str = 'album.addTags') -> Type.response:
         '''Tag an album using a list of user supplied tags.'''
         Validate.kwargs(check=sk, message=Validate.sk)
         api_sig = Auth.calculate_api_sig(locals())
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getInfo(artist: str = None, album: str = None, mbid: uuid.UUID = None, user: str = None, autocorrect: bool = None, lang: Type.language = None, api_key: Type.api_key = API_KEY, method: str = 'album.getInfo') -> Type.response:
         '''Get the metadata and tracklist for an album on Last.fm using the album name or a musicbrainz id.'''
         Validate.kwargs(check=((artist and album) or mbid), message=Validate.album)
@@ -376,7 +1194,7 @@ class album:
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getTags(artist: str = None, album: str = None, mbid: uuid.UUID = None, user: str = None, autocorrect: bool = None, api_key: Type.api_key = API_KEY, method: str = 'album.getTags') -> Type.response:
         '''Get the tags applied by an individual user to an album on Last.fm.'''
         Validate.kwargs(check=((artist and album) or mbid), message=Validate.album)
@@ -385,7 +1203,7 @@ class album:
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getTopTags(artist: str = None, album: str = None, mbid: uuid.UUID = None, autocorrect: bool = None, api_key: Type.api_key = API_KEY, method: str = 'album.getTopTags') -> Type.response:
         '''Get the top tags for an album on Last.fm, ordered by popularity.'''
         Validate.kwargs(check=((artist and album) or mbid), message=Validate.album)
@@ -393,14 +1211,14 @@ class album:
             logging.warning('Note that `autocorrect` only affects `artist`, not `album`.')
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def removeTag(artist: str, album: str, tag: str|int, api_sig: uuid.UUID = None, sk: str = Auth.session_key, api_key: Type.api_key = API_KEY, method: str = 'album.removeTag') -> Type.response:
         '''Remove a user's tag from an album.'''
         Validate.kwargs(check=sk, message=Validate.sk)
         api_sig = Auth.calculate_api_sig(locals())
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def search(album: str, limit: Type.PosInt(max=10000) = 50, page: Type.PosInt(max=10000) = 1, api_key: Type.api_key = API_KEY, method: str = 'album.search') -> Type.response:
         '''Search for an album by name. Returns album matches sorted by relevance.'''
         return Request.get(**locals())
@@ -408,64 +1226,72 @@ class album:
 
 class artist:
 
-    @pydantic.validate_call
+    @Validate.call
     def addTags(artist: str, tags: Type.tags, api_sig: uuid.UUID = None, sk: str = Auth.session_key, api_key: Type.api_key = API_KEY, method: str = 'artist.addTags') -> Type.response:
         '''Tag an artist with one or more user supplied tags.'''
         Validate.kwargs(check=sk, message=Validate.sk)
         api_sig = Auth.calculate_api_sig(locals())
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getCorrection(artist: str, api_key: Type.api_key = API_KEY, method: str = 'artist.getCorrection') -> Type.response:
         '''Use the last.fm corrections data to check whether the supplied artist has a correction to a canonical artist.'''
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getInfo(artist: str = None, mbid: uuid.UUID = None, user: str = None, autocorrect: bool = None, lang: Type.language = None, api_key: Type.api_key = API_KEY, method: str = 'artist.getInfo') -> Type.response:
         '''Get the metadata for an artist. Includes biography, truncated at 300 characters.'''
         Validate.kwargs(check=(artist or mbid), message=Validate.artist)
         sk = Auth.user(user=user, required=False)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getSimilar(artist: str = None, mbid: uuid.UUID = None, autocorrect: bool = None, limit: Type.PosInt(max=250) = 100, api_key: Type.api_key = API_KEY, method: str = 'artist.getSimilar') -> Type.response:
         '''Get all the artists similar to this artist.'''
         Validate.kwargs(check=(artist or mbid), message=Validate.artist)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getTags(artist: str = None, mbid: uuid.UUID = None, user: str = None, autocorrect: bool = None, api_key: Type.api_key = API_KEY, method: str = 'artist.getTags') -> Type.response:
         '''Get the tags applied by an individual user to an artist on Last.fm.'''
         Validate.kwargs(check=(artist or mbid), message=Validate.artist)
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getTopAlbums(artist: str = None, mbid: uuid.UUID = None, autocorrect: bool = None, limit: Type.PosInt(max=9999) = 50, page: Type.PosInt() = 1, api_key: Type.api_key = API_KEY, method: str = 'artist.getTopAlbums') -> Type.response:
         '''Get the top albums for an artist on Last.fm, ordered by popularity.'''
         Validate.kwargs(check=(artist or mbid), message=Validate.artist)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    def iterTopAlbums(**kwargs) -> typing.Iterator[models.artist.Album]:
+        '''Iterate over the top albums for an artist page by page (accepts the arguments of `artist.getTopAlbums`).'''
+        return Paginate.items(artist.getTopAlbums, entity='album', **kwargs)
+
+    @Validate.call
     def getTopTags(artist: str = None, mbid: uuid.UUID = None, autocorrect: bool = None, api_key: Type.api_key = API_KEY, method: str = 'artist.getTopTags') -> Type.response:
         '''Get the top tags for an artist on Last.fm, ordered by popularity.'''
         Validate.kwargs(check=(artist or mbid), message=Validate.artist)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getTopTracks(artist: str = None, mbid: uuid.UUID = None, autocorrect: bool = None, limit: Type.PosInt(max=10000) = 50, page: Type.PosInt() = 1, api_key: Type.api_key = API_KEY, method: str = 'artist.getTopTracks') -> Type.response:
         '''Get the top tracks by an artist on Last.fm, ordered by popularity.'''
         Validate.kwargs(check=(artist or mbid), message=Validate.artist)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    def iterTopTracks(**kwargs) -> typing.Iterator[models.artist.Track]:
+        '''Iterate over the top tracks by an artist page by page (accepts the arguments of `artist.getTopTracks`).'''
+        return Paginate.items(artist.getTopTracks, entity='track', **kwargs)
+
+    @Validate.call
     def removeTag(artist: str, tag: str|int, api_sig: uuid.UUID = None, sk: str = Auth.session_key, api_key: Type.api_key = API_KEY, method: str = 'artist.removeTag') -> Type.response:
         '''Remove a user's tag from an artist.'''
         Validate.kwargs(check=sk, message=Validate.sk)
         api_sig = Auth.calculate_api_sig(locals())
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def search(artist: str, limit: Type.PosInt(max=10000) = 30, page: Type.PosInt(max=10000) = 1, api_key: Type.api_key = API_KEY, method: str = 'artist.search') -> Type.response:
         '''Search for an artist by name. Returns artist matches sorted by relevance.'''
         return Request.get(**locals())
@@ -473,20 +1299,20 @@ class artist:
 
 class auth:
 
-    @pydantic.validate_call
+    @Validate.call
     def getMobileSession(username: str = Auth.username, password: str = Auth.password, api_sig: uuid.UUID = None, api_key: Type.api_key= API_KEY, method: str = 'auth.getMobileSession') -> Type.response:
         '''Create a web service session for a user.'''
         Validate.kwargs(check=(username and password), message='Please define your last.fm username and password as environment variables:\nexport LASTFM_USER=your_lastfm_username\nexport LASTFM_PASSWORD=your_lastfm_password')
         api_sig = Auth.calculate_api_sig(dict(username=username, password=password, method=method, api_key=api_key))
         return Request.post(**dict(username=username, password=password, method=method, api_key=api_key, api_sig=api_sig))
 
-    @pydantic.validate_call
+    @Validate.call
     def getSession(token: str, api_sig: uuid.UUID = None, api_key: Type.api_key= API_KEY, method: str = 'auth.getSession') -> Type.response:
         '''Fetch a session key for a user.'''
         api_sig = Auth.calculate_api_sig(dict(token=token, method=method, api_key=api_key))
         return Request.get(**dict(token=token, method=method, api_key=api_key, api_sig=api_sig))
 
-    @pydantic.validate_call
+    @Validate.call
     def getToken(api_sig: uuid.UUID = None, api_key: Type.api_key= API_KEY, method: str = 'auth.getToken') -> str:
         '''Fetch an unathorized request token for an API account.'''
         api_sig = Auth.calculate_api_sig(dict(method=method, api_key=api_key))
@@ -496,17 +1322,17 @@ class auth:
 
 class chart:
 
-    @pydantic.validate_call
+    @Validate.call
     def getTopArtists(limit: Type.PosInt(max=249) = 50, page: Type.page = 1, api_key: Type.api_key = API_KEY, method: str = 'chart.getTopArtists') -> Type.response:
         '''Get the top artists chart.'''
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getTopTags(limit: Type.limit = 50, page: Type.page = 1, api_key: Type.api_key = API_KEY, method: str = 'chart.getTopTags') -> Type.response:
         '''Get the top artists chart.'''
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getTopTracks(limit: Type.PosInt(max=249) = 50, page: Type.page = 1, api_key: Type.api_key = API_KEY, method: str = 'chart.getTopTracks') -> Type.response:
         '''Get the top tracks chart.'''
         return Request.get(**locals())
@@ -514,12 +1340,12 @@ class chart:
 
 class geo:
 
-    @pydantic.validate_call
+    @Validate.call
     def getTopArtists(country: Type.country, limit: Type.limit = 50, page: Type.page = 1, api_key: Type.api_key = API_KEY, method: str = 'geo.getTopArtists') -> Type.response:
         '''Get the most popular artists on Last.fm by country.'''
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getTopTracks(country: Type.country, location: str = None, limit: Type.limit = 50, page: Type.page = 1, api_key: Type.api_key = API_KEY, method: str = 'geo.getTopTracks') -> Type.response:
         '''Get the most popular tracks on Last.fm last week by country.'''
         return Request.get(**locals())
@@ -527,47 +1353,63 @@ class geo:
 
 class library:
 
-    @pydantic.validate_call
+    @Validate.call
     def getArtists(user: str = None, limit: Type.PosInt(max=2000) = 50, page: Type.page = 1, api_key: Type.api_key = API_KEY, method: str = 'library.getArtists') -> Type.response:
         '''A paginated list of all the artists in a user's library, with play counts and tag counts.'''
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
 
+    def iterArtists(**kwargs) -> typing.Iterator[models.library.Artist]:
+        '''Iterate over all the artists in a user's library page by page (accepts the arguments of `library.getArtists`).'''
+        return Paginate.items(library.getArtists, entity='artist', **kwargs)
+
 
 class tag:
 
-    @pydantic.validate_call
+    @Validate.call
     def getInfo(tag: str, lang: Type.language = None, api_key: Type.api_key = API_KEY, method: str = 'tag.getInfo') -> Type.response:
         '''Get the metadata for a tag.'''
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getSimilar(tag: str, api_key: Type.api_key = API_KEY, method: str = 'tag.getSimilar') -> Type.response:
         '''Search for tags similar to this one. Returns tags ranked by similarity, based on listening data.'''
         logging.warning('The `tag.getSimilar` API endpoint currently broken and returns an empty array as a response.')
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getTopAlbums(tag: str, limit: Type.limit = 50, page: Type.page = 1, api_key: Type.api_key = API_KEY, method: str = 'tag.getTopAlbums') -> Type.response:
         '''Get the top albums tagged by this tag, ordered by tag count.'''
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    def iterTopAlbums(**kwargs) -> typing.Iterator[models.tag.Album]:
+        '''Iterate over the top albums tagged by this tag page by page (accepts the arguments of `tag.getTopAlbums`).'''
+        return Paginate.items(tag.getTopAlbums, entity='album', **kwargs)
+
+    @Validate.call
     def getTopArtists(tag: str, limit: Type.limit = 50, page: Type.page = 1, api_key: Type.api_key = API_KEY, method: str = 'tag.getTopArtists') -> Type.response:
         '''Get the top artists tagged by this tag, ordered by tag count.'''
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    def iterTopArtists(**kwargs) -> typing.Iterator[models.tag.Artist]:
+        '''Iterate over the top artists tagged by this tag page by page (accepts the arguments of `tag.getTopArtists`).'''
+        return Paginate.items(tag.getTopArtists, entity='artist', **kwargs)
+
+    @Validate.call
     def getTopTags(api_key: Type.api_key = API_KEY, method: str = 'tag.getTopTags') -> Type.response:
         '''Fetches the top global tags on Last.fm, sorted by popularity (number of times used).'''
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getTopTracks(tag: str, limit: Type.limit = 50, page: Type.page = 1, api_key: Type.api_key = API_KEY, method: str = 'tag.getTopTracks') -> Type.response:
         '''Get the top tracks tagged by this tag, ordered by tag count.'''
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    def iterTopTracks(**kwargs) -> typing.Iterator[models.tag.Track]:
+        '''Iterate over the top tracks tagged by this tag page by page (accepts the arguments of `tag.getTopTracks`).'''
+        return Paginate.items(tag.getTopTracks, entity='track', **kwargs)
+
+    @Validate.call
     def getWeeklyChartList(tag: str, api_key: Type.api_key = API_KEY, method: str = 'tag.getWeeklyChartList') -> Type.response:
         '''Get a list of available charts for this tag, expressed as date ranges which can be sent to the chart services.'''
         return Request.get(**locals())
@@ -575,59 +1417,59 @@ class tag:
 
 class track:
 
-    @pydantic.validate_call
+    @Validate.call
     def addTags(artist: str, track: str, tags: Type.tags, api_sig: uuid.UUID = None, sk: str = Auth.session_key, api_key: Type.api_key = API_KEY, method: str = 'track.addTags') -> Type.response:
         '''Tag an album using a list of user supplied tags.'''
         Validate.kwargs(check=sk, message=Validate.sk)
         api_sig = Auth.calculate_api_sig(locals())
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getCorrection(artist: str, track: str, api_key: Type.api_key = API_KEY, method: str = 'track.getCorrection') -> Type.response:
         '''Use the last.fm corrections data to check whether the supplied track has a correction to a canonical track.'''
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getInfo(artist: str = None, track: str = None, mbid: uuid.UUID = None, user: str = None, autocorrect: bool = None, lang: Type.language = None, api_key: Type.api_key = API_KEY, method: str = 'track.getInfo') -> Type.response:
         '''Get the metadata for a track on Last.fm using the artist/track name or a musicbrainz id.'''
         Validate.kwargs(check=((artist and track) or mbid), message=Validate.track)
         sk = Auth.user(user=user, required=False)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getSimilar(artist: str = None, track: str = None, mbid: uuid.UUID = None, autocorrect: bool = None, limit: Type.PosInt(max=10000) = 100, api_key: Type.api_key = API_KEY, method: str = 'track.getSimilar') -> Type.response:
         '''Get the similar tracks for this track on Last.fm, based on listening data.'''
         Validate.kwargs(check=((artist and track) or mbid), message=Validate.track)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getTags(artist: str = None, track: str = None, mbid: uuid.UUID = None, user: str = None, autocorrect: bool = None, api_key: Type.api_key = API_KEY, method: str = 'track.getTags') -> Type.response:
         '''Get the tags applied by an individual user to a track on Last.fm.'''
         Validate.kwargs(check=((artist and track) or mbid), message=Validate.track)
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getTopTags(artist: str = None, track: str = None, mbid: uuid.UUID = None, autocorrect: bool = None, api_key: Type.api_key = API_KEY, method: str = 'track.getTopTags') -> Type.response:
         '''Get the top tags for this track on Last.fm, ordered by tag count. Supply either track & artist name or mbid.'''
         Validate.kwargs(check=((artist and track) or mbid), message=Validate.track)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def love(artist: str, track: str, api_sig: uuid.UUID = None, sk: str = Auth.session_key, api_key: Type.api_key = API_KEY, method: str = 'track.love') -> Type.response:
         '''Love a track for a user profile.'''
         Validate.kwargs(check=sk, message=Validate.sk)
         api_sig = Auth.calculate_api_sig(locals())
         return Request.post(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def removeTag(artist: str, track: str, tag: str|int, api_sig: uuid.UUID = None, sk: str = Auth.session_key, api_key: Type.api_key = API_KEY, method: str = 'track.removeTag') -> Type.response:
         '''Remove a user's tag from a track.'''
         Validate.kwargs(check=sk, message=Validate.sk)
         api_sig = Auth.calculate_api_sig(locals())
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def scrobble(artist: Type.strs, track: Type.strs, timestamp: Type.datetimes, album: Type.strs, mbid: Type.uuids = (), albumArtist: Type.strs = (), trackNumber: Type.ints = (), duration: Type.ints = (), context: Type.strs = (), streamId: Type.strs = (), chosenByUser: Type.bools = (), api_sig: uuid.UUID = None, sk: str = Auth.session_key, api_key: Type.api_key = API_KEY, method: str = 'track.scrobble') -> Type.response:
         '''Used to add a track-play to a user's profile.'''
         Validate.kwargs(check=sk, message=Validate.sk)
@@ -638,19 +1480,19 @@ class track:
         kwargs.update(dict(api_sig=Auth.calculate_api_sig(kwargs)))
         return Request.post(**kwargs)
 
-    @pydantic.validate_call
+    @Validate.call
     def search(track: str, artist: str = None, limit: Type.PosInt(max=10000) = 30, page: Type.PosInt(max=10000) = 1, api_key: Type.api_key = API_KEY, method: str = 'track.search') -> Type.response:
         '''Search for a track by track name. Returns track matches sorted by relevance.'''
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def unlove(artist: str, track: str, api_sig: uuid.UUID = None, sk: str = Auth.session_key, api_key: Type.api_key = API_KEY, method: str = 'track.unlove') -> Type.response:
         '''Unlove a track for a user profile.'''
         Validate.kwargs(check=sk, message=Validate.sk)
         api_sig = Auth.calculate_api_sig(locals())
         return Request.post(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def updateNowPlaying(artist: str, track: str, album: str = None, mbid: uuid.UUID = None, albumArtist: str = None, trackNumber: int = None, duration: int = None, context: str = None, api_sig: uuid.UUID = None, sk: str = Auth.session_key, api_key: Type.api_key = API_KEY, method: str = 'track.updateNowPlaying') -> Type.response:
         '''Used to notify Last.fm that a user has started listening to a track.'''
         Validate.kwargs(check=sk, message=Validate.sk)
@@ -661,86 +1503,119 @@ class track:
 
 class user:
 
-    @pydantic.validate_call
+    @Validate.call
     def getFriends(user: str = None, recenttracks: bool = False, limit: Type.PosInt(max=500) = 50, page: Type.PosInt() = 1, api_key: Type.api_key = API_KEY, method: str = 'user.getFriends') -> Type.response:
         '''Get a list of the user's friends on Last.fm.'''
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getInfo(user: str = None, api_key: Type.api_key = API_KEY, method: str = 'user.getInfo') -> Type.response:
         '''Get information about a user profile.'''
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getLovedTracks(user: str = None, limit: Type.limit = 50, page: Type.page = 1, api_key: Type.api_key = API_KEY, method: str = 'user.getLovedTracks') -> Type.response:
         '''Get the last 50 tracks loved by a user.'''
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    def iterLovedTracks(**kwargs) -> typing.Iterator[models.user.LovedTrack]:
+        '''Iterate over all the tracks loved by a user page by page (accepts the arguments of `user.getLovedTracks`).'''
+        return Paginate.items(user.getLovedTracks, entity='track', **kwargs)
+
+    @Validate.call
     def getPersonalTags(tag: str, taggingtype: Type.taggingtype, user: str = None, limit: Type.PosInt(max=100000) = 50, page: Type.PosInt(max=10000) = 1, api_key: Type.api_key = API_KEY, method: str = 'user.getPersonalTags') -> Type.response:
         '''Get the user's personal tags.'''
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getRecentTracks(user: str = None, FROM: Type.datetime = None, TO: Type.datetime = None, extended: bool = None, limit: Type.limit = 50, page: Type.page = 1, api_key: Type.api_key = API_KEY, method: str = 'user.getRecentTracks') -> Type.response:
         '''Get a list of the recent tracks listened to by this user. Also includes the currently playing track with the nowplaying="true" attribute if the user is currently listening. Artist mbid is missing with the `extended` argument.'''
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    def iterRecentTracks(**kwargs) -> typing.Iterator[models.user.RecentTrack|models.user.RecentTrackExtended]:
+        '''Iterate over the tracks listened to by a user page by page, skipping the currently playing track (accepts the arguments of `user.getRecentTracks`).'''
+        return (track for track in Paginate.items(user.getRecentTracks, entity='track', **kwargs) if not (track.attr and track.attr.nowplaying))
+
+    @Validate.call
     def getTopAlbums(user: str = None, period: Type.period = None, limit: Type.limit = 50, page: Type.page = 1, api_key: Type.api_key = API_KEY, method: str = 'user.getTopAlbums') -> Type.response:
         '''Get the top albums listened to by a user.'''
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    def iterTopAlbums(**kwargs) -> typing.Iterator[models.user.TopAlbum]:
+        '''Iterate over the top albums listened to by a user page by page (accepts the arguments of `user.getTopAlbums`).'''
+        return Paginate.items(user.getTopAlbums, entity='album', **kwargs)
+
+    @Validate.call
     def getTopArtists(user: str = None, period: Type.period = None, limit: Type.limit = 50, page: Type.page = 1, api_key: Type.api_key = API_KEY, method: str = 'user.getTopArtists') -> Type.response:
         '''Get the top artists listened to by a user.'''
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    def iterTopArtists(**kwargs) -> typing.Iterator[models.user.TopArtist]:
+        '''Iterate over the top artists listened to by a user page by page (accepts the arguments of `user.getTopArtists`).'''
+        return Paginate.items(user.getTopArtists, entity='artist', **kwargs)
+
+    @Validate.call
     def getTopTags(user: str = None, limit: Type.PosInt(max=100000) = 50, api_key: Type.api_key = API_KEY, method: str = 'user.getTopTags') -> Type.response:
         '''Get the top tags used by this user.'''
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getTopTracks(user: str = None, period: Type.period = None, limit: Type.limit = 50, page: Type.page = 1, api_key: Type.api_key = API_KEY, method: str = 'user.getTopTracks') -> Type.response:
         '''Get the top tracks listened to by a user.'''
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    def iterTopTracks(**kwargs) -> typing.Iterator[models.user.TopTrack]:
+        '''Iterate over the top tracks listened to by a user page by page (accepts the arguments of `user.getTopTracks`).'''
+        return Paginate.items(user.getTopTracks, entity='track', **kwargs)
+
+    @Validate.call
     def getWeeklyAlbumChart(user: str = None, FROM: Type.datetime = None, TO: Type.datetime = None, api_key: Type.api_key = API_KEY, method: str = 'user.getWeeklyAlbumChart') -> Type.response:
         '''Get an album chart for a user profile for a given date range.'''
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getWeeklyArtistChart(user: str = None, FROM: Type.datetime = None, TO: Type.datetime = None, api_key: Type.api_key = API_KEY, method: str = 'user.getWeeklyArtistChart') -> Type.response:
         '''Get an artist chart for a user profile for a given date range.'''
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getWeeklyChartList(user: str = None, api_key: Type.api_key = API_KEY, method: str = 'user.getWeeklyChartList') -> Type.response:
         '''Get a list of available charts for this user expressed as date ranges which can be sent to the chart services.'''
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
 
-    @pydantic.validate_call
+    @Validate.call
     def getWeeklyTrackChart(user: str = None, FROM: Type.datetime = None, TO: Type.datetime = None, api_key: Type.api_key = API_KEY, method: str = 'user.getWeeklyTrackChart') -> Type.response:
         '''Get a track chart for a user profile for a given date range.'''
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
 
-    @pydantic.validate_call # (config=pydantic.ConfigDict(validate_default=True))
+    @Validate.call # (config=pydantic.ConfigDict(validate_default=True))
     def getTrackScrobbles(artist: str, track: str, user: str = None, FROM: Type.datetime = None, TO: Type.datetime = None, limit: Type.limit = 50, page: Type.page = 1, api_key: Type.api_key = API_KEY, method: str = 'user.getTrackScrobbles') -> Type.response:
         '''[... there is a new method user.getTrackScrobbles which is just like user.getArtistTracks, except also takes a "track" parameter.](https://github.com/pylast/pylast/issues/298)'''
         sk = Auth.user(user=user, required=True)
         return Request.get(**locals())
+
+
+class aio:
+    '''Asynchronous mirror of the API method namespaces (e.g. `await aio.artist.getInfo(artist='tool')`) which validates the same arguments and returns the same `models`.'''
+    album = AsyncRequest.namespace(album)
+    artist = AsyncRequest.namespace(artist)
+    auth = AsyncRequest.namespace(auth)
+    chart = AsyncRequest.namespace(chart)
+    geo = AsyncRequest.namespace(geo)
+    library = AsyncRequest.namespace(library)
+    tag = AsyncRequest.namespace(tag)
+    track = AsyncRequest.namespace(track)
+    user = AsyncRequest.namespace(user)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+FORMAT = '%(asctime)s %(levelname)-8s %(message)s'
+STYLES = ('rich', 'plain')
+QUIET = ('httpx', 'httpcore') # per-request records which duplicate `lastfm.Request`'s own, only shown at DEBUG level
+
+log = logging.getLogger('lastfm')
+_listener: logging.handlers.QueueListener = None
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    '''Enqueue records with their message merged (capturing mutable arguments), leaving the formatting to the `QueueListener` thread.'''
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg, record.args = record.getMessage(), None
+        return record
+
+
+def handler(style: str = None) -> logging.Handler:
+    '''Return a `rich` handler for interactive sessions or a much faster plain one (`style` defaults to `LOG_STYLE`, or else to whether stderr is a terminal).'''
+    style = style or os.getenv('LOG_STYLE') or ('rich' if sys.stderr.isatty() else 'plain')
+    if style not in STYLES:
+        raise ValueError(f'`style` must be one of {STYLES}')
+    if style == 'rich':
+        import rich.logging
+        return rich.logging.RichHandler(rich_tracebacks=True, log_time_format='[%Y-%m-%d %H:%M:%S]') # [rich.logging](https://rich.readthedocs.io/en/stable/reference/logging.html)
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(FORMAT))
+    return handler
+
+def configure(level: int|str = None, style: str = None, force: bool = False) -> None:
+    '''Route the records of the root logger through a queue to a thread which formats and writes them; like `logging.basicConfig`, this does nothing if the root logger already has handlers, unless `force`.'''
+    global _listener
+    root = logging.getLogger()
+    if root.handlers and not force:
+        return
+    stop()
+    for old in root.handlers[:]:
+        root.removeHandler(old)
+        old.close()
+    records = queue.SimpleQueue()
+    root.addHandler(QueueHandler(records))
+    root.setLevel(level or os.getenv('LOG_LEVEL', 'INFO').upper())
+    for name in QUIET:
+        logging.getLogger(name).setLevel(logging.NOTSET if root.level <= logging.DEBUG else logging.WARNING)
+    _listener = logging.handlers.QueueListener(records, handler(style=style))
+    _listener.start()
+
+def stop() -> None:
+    '''Flush the queued records and stop the listener thread.'''
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+atexit.register(stop)
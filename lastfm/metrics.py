@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+import bisect
+import collections
+import contextlib
+import dataclasses
+import http.server
+import logging
+import os
+import threading
+import time
+import typing
+
+PORT = os.getenv('METRICS_PORT') # serve the metrics over HTTP from the command-line entry points if set
+
+HELP = {
+    'api_request_duration_seconds': ('histogram', 'Latency of API requests (from sending the request to reading the whole body).'),
+    'api_response_bytes_total': ('counter', 'Bytes received in API response bodies.'),
+    'api_retries_total': ('counter', 'API requests retried after a transient failure.'),
+    'api_cache_requests_total': ('counter', 'Response cache lookups, by result (hit or miss).'),
+    'api_coalesced_total': ('counter', 'Requests which shared the response of an identical in-flight request.'),
+    'api_ratelimit_wait_seconds_total': ('counter', 'Time spent waiting for the rate limiter.'),
+    'api_errors_total': ('counter', 'Errors returned in API response bodies, by error code (e.g. `lastfm.Errors`).'),
+    'api_http_errors_total': ('counter', 'HTTP error responses, by status.'),
+    }
+
+
+@dataclasses.dataclass
+class Registry:
+    '''Thread-safe registry of counters and histograms exposed in the [Prometheus text format](https://prometheus.io/docs/instrumenting/exposition_formats/#text-based-format).'''
+    buckets: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __post_init__(self):
+        self.lock = threading.Lock()
+        self.counters = collections.defaultdict(float)
+        self.histograms = {}
+
+    @staticmethod
+    def labels(**labels) -> tuple[tuple[str, str], ...]:
+        return tuple(sorted((key, str(val)) for key, val in labels.items() if val is not None))
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        '''Increment the counter `name` by `value`.'''
+        with self.lock:
+            self.counters[(name, self.labels(**labels))] += value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        '''Record `value` in the histogram `name`.'''
+        with self.lock:
+            counts, total = self.histograms.setdefault((name, self.labels(**labels)), ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    @contextlib.contextmanager
+    def time(self, name: str, **labels) -> typing.Iterator[None]:
+        '''Record the duration of the `with` block in the histogram `name`.'''
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def exposition(self) -> str:
+        '''Render every metric in the Prometheus text format.'''
+        def series(name: str, labels: tuple[tuple[str, str], ...], value: float) -> str:
+            labels = ','.join(f'{key}="{val.replace(chr(92), chr(92)*2).replace(chr(34), chr(92)+chr(34))}"' for key, val in labels)
+            value = repr(float(value)) # shortest exact representation (`:g` would round sums and large counters to 6 digits)
+            return f'{name}{{{labels}}} {value}' if labels else f'{name} {value}'
+        lines, described = [], set()
+        with self.lock:
+            counters, histograms = sorted(self.counters.items()), sorted((key, (list(counts), total[0])) for key, (counts, total) in self.histograms.items())
+        for (name, labels), value in counters:
+            if name not in described:
+                kind, doc = HELP.get(name, ('counter', ''))
+                lines += [f'# HELP {name} {doc}', f'# TYPE {name} {kind}']
+                described.add(name)
+            lines.append(series(name, labels, value))
+        for (name, labels), (counts, total) in histograms:
+            if name not in described:
+                kind, doc = HELP.get(name, ('histogram', ''))
+                lines += [f'# HELP {name} {doc}', f'# TYPE {name} {kind}']
+                described.add(name)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float('inf')), counts):
+                cumulative += count
+                lines.append(series(f'{name}_bucket', (*labels, ('le', '+Inf' if bound == float('inf') else f'{bound:g}')), cumulative))
+            lines += [series(f'{name}_sum', labels, total), series(f'{name}_count', labels, cumulative)]
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port: int = 9464, address: str = '127.0.0.1') -> http.server.ThreadingHTTPServer:
+        '''Serve `exposition()` at `http://{address}:{port}/metrics` from a daemon thread.'''
+        registry = self
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    return self.send_error(404)
+                body = registry.exposition().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            def log_message(self, format: str, *args):
+                logging.debug(format % args)
+        server = http.server.ThreadingHTTPServer((address, port), Handler)
+        threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+        logging.info(f'serving metrics at http://{address}:{server.server_port}/metrics')
+        return server
+
+
+REGISTRY = Registry()
+
+
+def serve() -> http.server.ThreadingHTTPServer|None:
+    '''Serve `REGISTRY` on the port given by the `METRICS_PORT` environment variable, if any.'''
+    if PORT:
+        return REGISTRY.serve(port=int(PORT))
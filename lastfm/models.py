@@ -3,18 +3,59 @@
 from __future__ import annotations
 import datetime
 import enum
+import functools
+import json
+import types
 import typing
 import uuid
 
-import dateparser
 import pydantic
 
+MONTHS = {month: number for number, month in enumerate(('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), start=1)}
+
+@functools.lru_cache(maxsize=2**16)
+def parseFixedDateTime(dt: typing.Any) -> datetime.datetime|None:
+    '''Parse `dt` from one of the fixed formats emitted by Last.fm (unix timestamps, "04 Nov 2007, 20:07" and ISO 8601) into a UTC `datetime`; memoized since the same strings recur across pages.'''
+    if isinstance(dt, datetime.datetime):
+        return dt if dt.tzinfo else dt.replace(tzinfo=datetime.timezone.utc)
+    if isinstance(dt, (int, float)) or str(dt).strip().isdigit():
+        return datetime.datetime.fromtimestamp(int(dt), tz=datetime.timezone.utc)
+    dt = str(dt).strip()
+    try:
+        day, month, year, time = dt.replace(',', '').split(' ')
+        hour, minute = time.split(':')
+        return datetime.datetime(int(year), MONTHS[month[:3].lower()], int(day), int(hour), int(minute), tzinfo=datetime.timezone.utc)
+    except (ValueError, KeyError):
+        pass
+    try:
+        parsed = datetime.datetime.fromisoformat(dt)
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=datetime.timezone.utc)
+    except ValueError:
+        return None
+
+def parseDateTime(dt: typing.Any) -> datetime.datetime|None:
+    '''Parse `dt` into a timezone-aware `datetime` (naive values are assumed to be UTC), falling back on the slow `dateparser.parse` (never memoized, since relative dates such as "yesterday" change) for formats not covered by `parseFixedDateTime`.'''
+    if dt is None:
+        return None
+    if parsed := parseFixedDateTime(dt):
+        return parsed
+    import dateparser
+    return dateparser.parse(str(dt), settings=dict(TIMEZONE='utc', RETURN_AS_TIMEZONE_AWARE=True))
+
 def validateDateTime(field: str) -> classmethod:
-    '''Reusable validator for datetime strings based on `dateparser.parse`.'''
-    def parseDateTime(dt: str) -> datetime.datetime:
-        return dateparser.parse(str(dt), settings=dict(TIMEZONE='utc', RETURN_AS_TIMEZONE_AWARE=True))
+    '''Reusable validator for datetime strings based on `parseDateTime`.'''
     return pydantic.field_validator(field, mode='before')(parseDateTime)
 
+def validateList(field: str) -> classmethod:
+    '''Reusable validator which wraps a lone object into a list, since Last.fm collapses single-item arrays into objects.'''
+    def parseList(val: typing.Any) -> typing.List:
+        return val if isinstance(val, list) else [val]
+    return pydantic.field_validator(field, mode='before')(parseList)
+
+def nullString(val: typing.Any) -> typing.Any:
+    '''Return `None` if `val` is an empty string or a literal "none", "n/a", "fixme" string (shared by `BaseModel` and `Trusted`).'''
+    return None if isinstance(val, str) and (not val.strip() or val.lower() in ('none', 'n/a', 'fixme')) else val
+
 
 class BaseModel(pydantic.BaseModel, extra='forbid'):
     '''Base class which forbids extra fields and coerces empty or literal "none" strings into `None`.'''
@@ -22,8 +63,282 @@ class BaseModel(pydantic.BaseModel, extra='forbid'):
     @pydantic.field_validator('*', mode='before')
     @classmethod
     def nullString(cls, val: typing.Any) -> typing.Any:
-        '''Return `None` if `val` is an empty string or a literal "none", "n/a", "fixme" string'''
-        return None if isinstance(val, str) and (not val.strip() or val.lower() in ('none', 'n/a', 'fixme')) else val
+        return nullString(val)
+
+
+class Trusted:
+    '''Build models from trusted payloads without `pydantic` validation, converting only numbers, booleans and null strings.'''
+    builders: typing.ClassVar[dict[type[pydantic.BaseModel], typing.Callable]] = {}
+
+    @staticmethod
+    def scalar(convert: typing.Callable) -> typing.Callable:
+        '''Wrap `convert` so that `None` and null strings (see `nullString`) become `None`.'''
+        def scalar(val: typing.Any) -> typing.Any:
+            val = nullString(val)
+            return None if val is None else convert(val)
+        return scalar
+
+    @staticmethod
+    def bool(val: typing.Any) -> bool:
+        return val if isinstance(val, bool) else (str(val).lower() in ('1', 'true', 'yes'))
+
+    @classmethod
+    def converter(cls, annotation: typing.Any) -> typing.Callable:
+        '''Return the function converting a JSON value into a value of type `annotation`.'''
+        origin, args = typing.get_origin(annotation), typing.get_args(annotation)
+        if origin in (typing.Union, types.UnionType):
+            members = tuple(arg for arg in args if arg is not type(None))
+            models = tuple(member for member in members if isinstance(member, type) and issubclass(member, pydantic.BaseModel))
+            scalars = [cls.converter(member) for member in members if member not in models]
+            scalar = scalars[0] if scalars else nullString
+            if not models:
+                return scalar
+            return lambda val: cls.union(models, val) if (models and isinstance(val, dict)) else scalar(val)
+        if origin in (list, typing.List):
+            convert = cls.converter(args[0]) if args else nullString
+            return lambda vals: [convert(val) for val in (vals if isinstance(vals, list) else [vals])]
+        if isinstance(annotation, type) and issubclass(annotation, pydantic.BaseModel):
+            return lambda val: (cls.builders.get(annotation) or cls.builder(annotation))(val) if isinstance(val, dict) else nullString(val) # resolved lazily, as models may be recursive
+        if annotation in (int, float):
+            return cls.scalar(annotation)
+        if annotation is bool:
+            return cls.scalar(cls.bool)
+        return nullString
+
+    @staticmethod
+    @functools.cache
+    def plan(model: type[pydantic.BaseModel]) -> tuple[tuple[str, str, typing.Callable], ...]:
+        '''Compile the (field name, JSON key, converter) of every field of `model`.'''
+        if not model.__pydantic_complete__:
+            model.model_rebuild()
+        return tuple((name, field.alias or name, Trusted.converter(field.annotation)) for name, field in model.model_fields.items())
+
+    @staticmethod
+    @functools.cache
+    def required(model: type[pydantic.BaseModel]) -> frozenset[str]:
+        '''Return the JSON keys of the required fields of `model`.'''
+        return frozenset(field.alias or name for name, field in model.model_fields.items() if field.is_required())
+
+    @classmethod
+    def select(cls, members: tuple[type[pydantic.BaseModel], ...], data: dict[str, typing.Any]) -> type[pydantic.BaseModel]:
+        '''Pick the member of a union of models whose required keys are all present in `data`, preferring the most specific one.'''
+        candidates = [member for member in members if cls.required(member) <= data.keys()]
+        return max(candidates or members, key=lambda member: len(cls.required(member)))
+
+    @classmethod
+    def union(cls, members: tuple[type[pydantic.BaseModel], ...], data: dict[str, typing.Any]) -> pydantic.BaseModel:
+        '''Build the member of a union of models which matches `data`.'''
+        return cls.construct(cls.select(members, data), data)
+
+    @classmethod
+    def builder(cls, model: type[pydantic.BaseModel]) -> typing.Callable[[dict[str, typing.Any]], pydantic.BaseModel]:
+        '''Return (once per model) a function which builds `model` from a JSON object as `model_construct` does, through the converters of `plan`.'''
+        if build := cls.builders.get(model):
+            return build
+        fields = cls.plan(model)
+        if model.__pydantic_post_init__ or model.__pydantic_root_model__ or any(field.default_factory for field in model.model_fields.values()):
+            build = lambda data: model.model_construct(**{name: convert(data[key]) for name, key, convert in fields if key in data})
+            return cls.builders.setdefault(model, build)
+        defaults = {name: field.default for name, field in model.model_fields.items() if not field.is_required()}
+        new, setattr = model.__new__, object.__setattr__
+        def build(data: dict[str, typing.Any]) -> pydantic.BaseModel:
+            values = {name: convert(data[key]) for name, key, convert in fields if key in data}
+            instance = new(model) # skip `model_construct`, which re-derives the defaults and fields set on every call
+            setattr(instance, '__dict__', (defaults | values) if defaults else values)
+            setattr(instance, '__pydantic_fields_set__', set(values))
+            setattr(instance, '__pydantic_extra__', None)
+            setattr(instance, '__pydantic_private__', None)
+            return instance
+        return cls.builders.setdefault(model, build)
+
+    @classmethod
+    def construct(cls, model: type[pydantic.BaseModel], data: dict[str, typing.Any]) -> pydantic.BaseModel:
+        '''Build `model` from `data` without validation.'''
+        return cls.builder(model)(data)
+
+
+class Projected(typing.NamedTuple):
+    items: typing.List[typing.Dict[str, typing.Any]]
+    attr: typing.Optional[pydantic.BaseModel] = None
+
+
+class Projection:
+    '''Extract only the requested dotted field paths (e.g. `artist.name`) from each item of a list response, typed according to the model of the item, and skip everything else.'''
+
+    @staticmethod
+    def unwrap(annotation: typing.Any) -> tuple[type[pydantic.BaseModel], ...]:
+        '''Return the models contained in `annotation` (e.g. `typing.Optional[Model]` or `typing.List[typing.Union[Model, Other]]`).'''
+        if typing.get_origin(annotation) in (typing.Union, types.UnionType, list, typing.List):
+            return tuple(model for arg in typing.get_args(annotation) for model in Projection.unwrap(arg))
+        return (annotation,) if isinstance(annotation, type) and issubclass(annotation, pydantic.BaseModel) else ()
+
+    @staticmethod
+    @functools.cache
+    def locate(model: type[pydantic.BaseModel]) -> tuple[tuple[str, ...], tuple[type[pydantic.BaseModel], ...]]:
+        '''Return the JSON keys leading to the items of the list response `model` and the model(s) of those items, or empty tuples if `model` is not a list response.'''
+        if not model.__pydantic_complete__:
+            model.model_rebuild()
+        fields = [(field.alias or name, field.annotation) for name, field in model.model_fields.items() if (name != 'attr') and (':' not in (field.alias or name))]
+        if len(fields) != 1:
+            return (), ()
+        key, annotation = fields[0]
+        if (typing.get_origin(annotation) in (list, typing.List)) and Projection.unwrap(annotation):
+            return (key,), Projection.unwrap(annotation)
+        for nested in Projection.unwrap(annotation):
+            keys, members = Projection.locate(nested)
+            if members:
+                return (key, *keys), members
+        return (), ()
+
+    @staticmethod
+    @functools.cache
+    def compile(model: type[pydantic.BaseModel], paths: tuple[str, ...]) -> tuple[tuple[str, tuple[str, ...], typing.Callable], ...]:
+        '''Resolve each dotted field path of `model` into its sequence of JSON keys and the converter of its last field.'''
+        compiled = []
+        for path in paths:
+            keys, current, annotation = [], model, None
+            for name in path.split('.'):
+                if not current:
+                    raise ValueError(f'`{path}` does not name a field of `{model.__qualname__}`')
+                if not current.__pydantic_complete__:
+                    current.model_rebuild()
+                field = current.model_fields.get(name)
+                if field is None:
+                    raise ValueError(f'`{path}` does not name a field of `{model.__qualname__}`')
+                keys.append(field.alias or name)
+                annotation = field.annotation
+                current = next(iter(Projection.unwrap(annotation)), None)
+            compiled.append((path, tuple(keys), Trusted.converter(annotation)))
+        return tuple(compiled)
+
+    @staticmethod
+    def extract(item: dict[str, typing.Any], keys: tuple[str, ...]) -> typing.Any:
+        for key in keys:
+            if not isinstance(item, dict):
+                return None
+            item = item.get(key)
+        return item
+
+    @classmethod
+    def project(cls, model: type[pydantic.BaseModel], data: dict[str, typing.Any], paths: typing.Iterable[str]) -> Projected:
+        '''Project the items of the list response `data` (described by `model`) onto `paths`.'''
+        keys, members = cls.locate(model)
+        if not members:
+            raise ValueError(f'`{model.__qualname__}` does not contain a list of items')
+        paths = tuple(paths)
+        plans = {member: cls.compile(member, paths) for member in members}
+        items = cls.extract(data, keys) or []
+        items = items if isinstance(items, list) else [items]
+        projected = []
+        for item in items:
+            plan = plans[Trusted.select(members, item) if (len(members) > 1) else members[0]]
+            projected.append({path: convert(cls.extract(item, item_keys)) for path, item_keys, convert in plan})
+        attr = model.model_fields.get('attr')
+        attr = Trusted.converter(attr.annotation)(data['@attr']) if (attr is not None) and ('@attr' in data) else None
+        return Projected(items=projected, attr=attr)
+
+
+class Columnar:
+    '''Decode the items of a list response straight into a `pyarrow.Table`, with nested models flattened into dotted columns (e.g. `artist.name`).'''
+
+    @staticmethod
+    def members(annotation: typing.Any) -> tuple[typing.Any, ...]:
+        '''Return the non-`None` members of `annotation`.'''
+        if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+            return tuple(arg for arg in typing.get_args(annotation) if arg is not type(None)) or (type(None),)
+        return (annotation,)
+
+    @classmethod
+    def arrow(cls, annotation: typing.Any) -> pyarrow.DataType:
+        '''Return the `pyarrow` type of the values of `annotation`.'''
+        import pyarrow
+        members = cls.members(annotation)
+        if len(members) > 1:
+            return pyarrow.string()
+        annotation = members[0]
+        if typing.get_origin(annotation) in (list, typing.List):
+            return pyarrow.list_(cls.arrow(typing.get_args(annotation)[0]) if typing.get_args(annotation) else pyarrow.string())
+        if isinstance(annotation, type) and issubclass(annotation, pydantic.BaseModel):
+            return pyarrow.struct([(name, cls.arrow(field.annotation)) for name, field in annotation.model_fields.items()])
+        scalars = {bool: pyarrow.bool_(), int: pyarrow.int64(), float: pyarrow.float64(), datetime.datetime: pyarrow.timestamp('s', tz='UTC'), type(None): pyarrow.null()}
+        return scalars.get(annotation, pyarrow.string())
+
+    @classmethod
+    def converter(cls, annotation: typing.Any) -> typing.Callable:
+        '''Return the function converting a JSON value into a value of the `pyarrow` type of `annotation`.'''
+        members = cls.members(annotation)
+        if len(members) > 1:
+            return Trusted.scalar(str)
+        annotation = members[0]
+        if typing.get_origin(annotation) in (list, typing.List):
+            convert = cls.converter(typing.get_args(annotation)[0]) if typing.get_args(annotation) else Trusted.scalar(str)
+            return lambda vals: None if vals is None else [convert(val) for val in (vals if isinstance(vals, list) else [vals])]
+        if isinstance(annotation, type) and issubclass(annotation, pydantic.BaseModel):
+            plan = tuple((name, field.alias or name, cls.converter(field.annotation)) for name, field in annotation.model_fields.items())
+            return lambda val: {name: convert(val.get(key)) for name, key, convert in plan} if isinstance(val, dict) else None
+        if annotation is datetime.datetime:
+            return Trusted.scalar(parseDateTime)
+        if annotation is bool:
+            return Trusted.scalar(Trusted.bool)
+        if annotation in (int, float):
+            return Trusted.scalar(annotation)
+        return Trusted.scalar(str)
+
+    @classmethod
+    def fields(cls, model: type[pydantic.BaseModel], path: tuple[str, ...] = (), keys: tuple[str, ...] = ()) -> typing.Iterator[tuple[str, tuple[str, ...], typing.Any]]:
+        '''Yield the (dotted column name, JSON keys, annotation) of every leaf field of `model`, flattening nested (non-list) models.'''
+        if not model.__pydantic_complete__:
+            model.model_rebuild()
+        for name, field in model.model_fields.items():
+            nested = Projection.unwrap(field.annotation) if (typing.get_origin(field.annotation) not in (list, typing.List)) else ()
+            if nested:
+                for member in nested:
+                    yield from cls.fields(member, (*path, name), (*keys, field.alias or name))
+            else:
+                yield '.'.join((*path, name)), (*keys, field.alias or name), field.annotation
+
+    @staticmethod
+    @functools.cache
+    def plan(model: type[pydantic.BaseModel]) -> tuple[tuple[str, tuple[str, ...], typing.Callable, pyarrow.DataType], ...]:
+        '''Compile the (column name, JSON keys, converter, `pyarrow` type) of every column of the items of `model`.'''
+        plan = {}
+        for column, keys, annotation in Columnar.fields(model):
+            plan.setdefault(column, (column, keys, Columnar.converter(annotation), Columnar.arrow(annotation)))
+        return tuple(plan.values())
+
+    @classmethod
+    def schema(cls, members: tuple[type[pydantic.BaseModel], ...], paths: typing.Iterable[str] = None) -> dict[str, pyarrow.DataType]:
+        '''Merge the columns of `members` (preferring typed over all-null columns), restricted to the columns named by or nested under `paths`.'''
+        import pyarrow
+        schema = {}
+        for member in members:
+            for column, _, _, arrow in cls.plan(member):
+                if (column not in schema) or (schema[column] == pyarrow.null()):
+                    schema[column] = arrow
+        if paths:
+            schema = {column: arrow for column, arrow in schema.items() if any((column == path) or column.startswith(f'{path}.') for path in paths)}
+        return schema
+
+    @classmethod
+    def table(cls, model: type[pydantic.BaseModel], data: dict[str, typing.Any], paths: typing.Iterable[str] = None) -> pyarrow.Table:
+        '''Decode the items of the list response `data` (described by `model`) into a `pyarrow.Table`, optionally restricted to `paths`; the pagination `@attr` is kept in the schema metadata.'''
+        import pyarrow
+        keys, members = Projection.locate(model)
+        if not members:
+            raise ValueError(f'`{model.__qualname__}` does not contain a list of items')
+        schema = cls.schema(members, paths=paths)
+        plans = {member: [(column, item_keys, convert) for column, item_keys, convert, _ in cls.plan(member) if column in schema] for member in members}
+        missing = {member: schema.keys() - {column for column, _, _ in plan} for member, plan in plans.items()} # columns of the other members of a union
+        columns = {column: [] for column in schema}
+        items = Projection.extract(data, keys) or []
+        for item in (items if isinstance(items, list) else [items]):
+            member = Trusted.select(members, item) if (len(members) > 1) else members[0]
+            for column, item_keys, convert in plans[member]:
+                columns[column].append(convert(Projection.extract(item, item_keys)))
+            for column in missing[member]:
+                columns[column].append(None)
+        metadata = {'@attr': json.dumps(data['@attr'])} if isinstance(data.get('@attr'), dict) else None
+        return pyarrow.table({column: pyarrow.array(values, type=schema[column]) for column, values in columns.items()}, metadata=metadata)
 
 
 class ImageSize(str, enum.Enum):
@@ -667,6 +982,7 @@ class track:
     class Scrobbles(BaseModel):
         scrobble: typing.List[track.Scrobble]
         attr: track.ScrobbleAttr = pydantic.Field(alias='@attr')
+        _ = validateList('scrobble')
 
     '''track.search'''
 
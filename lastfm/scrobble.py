@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+import concurrent.futures
+import dataclasses
+import logging
+import os
+import pathlib
+import sqlite3
+import typing
+
+import lastfm
+import metrics
+import models
+
+FIELDS = ('artist', 'track', 'timestamp', 'album', 'mbid', 'albumArtist', 'trackNumber', 'duration', 'context', 'streamId', 'chosenByUser')
+
+
+@dataclasses.dataclass
+class Journal:
+    '''Durable queue of plays to scrobble: plays are written to a local SQLite journal first and only marked as done once Last.fm has acknowledged them, so an interrupted import resumes where it stopped.'''
+    path: pathlib.Path = pathlib.Path(os.getenv('LASTFM_SCROBBLE_JOURNAL', '~/.cache/lastfm/scrobbles.sqlite')).expanduser()
+    batch_size: int = 50 # maximum number of plays accepted by a single `track.scrobble` call
+    concurrency: int = 4
+
+    def __post_init__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path) # `with self.connection` commits each batch as one transaction
+        self.connection.execute(f"CREATE TABLE IF NOT EXISTS play (id INTEGER PRIMARY KEY, {', '.join(FIELDS)}, code INTEGER, UNIQUE (artist, track, timestamp))")
+
+    def add(self, plays: typing.Iterable[dict[str, typing.Any]]) -> int:
+        '''Append `plays` (dictionaries keyed by the arguments of `track.scrobble`) to the journal, skipping plays without `artist`, `track` or `timestamp` and plays which are already in it, and return the number of new plays.'''
+        plays = list(plays)
+        valid = [play for play in plays if all(play.get(field) for field in FIELDS[:3])] # a NULL would defeat the UNIQUE constraint and fail its whole batch on every `flush`
+        if len(valid) < len(plays):
+            logging.warning(f'{len(plays) - len(valid)} plays skipped: `artist`, `track` and `timestamp` are required')
+        rows = ([play.get('artist'), play.get('track'), lastfm.Type.datetime_to_timestamp(play.get('timestamp')), play.get('album') or ''] + [play.get(field) for field in FIELDS[4:]] for play in valid)
+        rows = ([str(val) if (field == 'mbid') and val else val for field, val in zip(FIELDS, row)] for row in rows)
+        with self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(f"INSERT OR IGNORE INTO play ({', '.join(FIELDS)}) VALUES ({', '.join('?' for _ in FIELDS)})", rows)
+            return self.connection.total_changes - before
+
+    def pending(self) -> list[tuple]:
+        '''Return the plays which have not been acknowledged by Last.fm yet, oldest first.'''
+        return self.connection.execute(f"SELECT id, {', '.join(FIELDS)} FROM play WHERE code IS NULL ORDER BY timestamp").fetchall()
+
+    def batches(self) -> typing.Iterator[list[tuple]]:
+        '''Split the pending plays into batches of `batch_size`.'''
+        pending = self.pending()
+        for idx in range(0, len(pending), self.batch_size):
+            yield pending[idx:idx+self.batch_size]
+
+    @staticmethod
+    def submit(batch: list[tuple]) -> models.track.Scrobbles|models.Error|None:
+        '''Scrobble `batch` with a single signed `track.scrobble` call.'''
+        columns = {field: [row[idx] for row in batch] for idx, field in enumerate(FIELDS, start=1)}
+        columns = {field: values for field, values in columns.items() if any(val is not None for val in values)}
+        return lastfm.track.scrobble(**columns, sk=lastfm.Auth.session_key)
+
+    def acknowledge(self, batch: list[tuple], response: models.track.Scrobbles|models.Error|None) -> None:
+        '''Record the per-play outcome of `response` in the journal; plays from a failed call stay pending and are replayed by the next `flush`.'''
+        if not isinstance(response, models.track.Scrobbles):
+            return logging.error(f'{len(batch)} plays left pending: {response}')
+        codes = [(int(scrobble.ignoredMessage.code), row[0]) for row, scrobble in zip(batch, response.scrobble)]
+        with self.connection:
+            self.connection.executemany('UPDATE play SET code = ? WHERE id = ?', codes)
+        logging.info(f'{response.attr.accepted} plays accepted, {response.attr.ignored} ignored')
+
+    def flush(self) -> dict[str, int]:
+        '''Scrobble every pending play in signed batches of `batch_size`, with at most `concurrency` calls in flight (all of them still throttled by `lastfm.RateLimit`).'''
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {executor.submit(self.submit, batch): batch for batch in self.batches()}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    self.acknowledge(batch=futures[future], response=future.result())
+                except Exception as error:
+                    logging.error(f'{len(futures[future])} plays left pending: {error!r}')
+        return self.status()
+
+    def status(self) -> dict[str, int]:
+        '''Count the plays in the journal by outcome.'''
+        counts = dict(self.connection.execute('SELECT code, COUNT(*) FROM play GROUP BY code').fetchall())
+        return {'PENDING' if code is None else models.track.ScrobbleErrors(code).name: count for code, count in counts.items()}
+
+
+def main():
+    '''Replay the plays left pending in the journal (e.g. after an interrupted import).'''
+    lastfm.configureLogging()
+    metrics.serve()
+    logging.info(Journal().flush())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+import bisect
+import dataclasses
+import gzip
+import http.server
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+import typing
+import urllib
+import uuid
+
+import lastfm
+import models
+
+STATUS = {lastfm.Errors.INVALID_API_KEY: 403, lastfm.Errors.OPERATION_FAILED: 500, lastfm.Errors.SERVICE_OFFLINE: 503, lastfm.Errors.TEMPORARY_ERROR: 503, lastfm.Errors.RATE_LIMIT_EXCEEDED: 429} # HTTP status of each error (400 otherwise)
+
+
+@dataclasses.dataclass
+class History:
+    '''Deterministic synthetic scrobble history of `user`: `plays` timestamps between `start` and `end` (unix time), each a play of one of `tracks` tracks by `artists` artists.'''
+    user: str = 'standin'
+    plays: int = 100_000
+    start: int = 1262304000 # 2010-01-01
+    end: int = 1704067199 # 2023-12-31
+    artists: int = 2000
+    tracks: int = 40000
+    seed: int = 0
+
+    def __post_init__(self):
+        rng = random.Random(self.seed)
+        self.timestamps = sorted(rng.randrange(self.start, self.end + 1) for _ in range(self.plays)) # oldest first, for `bisect`
+        self.songs = [int(rng.paretovariate(1.2)) % self.tracks for _ in range(self.plays)] # a few tracks account for most plays
+
+    def mbid(self, kind: str, idx: int) -> str:
+        '''Return a stable mbid for two thirds of the entities, and an empty string (as Last.fm does when it has none) for the rest.'''
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f'{self.seed}/{kind}/{idx}')) if idx % 3 else ''
+
+    def track(self, idx: int = None, extended: bool = False) -> dict[str, typing.Any]:
+        '''Return the `recenttracks.track` item of play `idx` (or of the track now playing if `idx` is `None`).'''
+        song = self.songs[idx] if idx is not None else self.songs[-1]
+        artist, album = song % self.artists, song // 10
+        url = f'https://www.last.fm/music/Artist+{artist}'
+        image = [{'size': size, '#text': f'https://lastfm.freetls.fastly.net/i/u/{size}/{song}.png'} for size in ('small', 'medium', 'large', 'extralarge')]
+        item = {
+            'artist': {'url': url, 'name': f'Artist {artist}', 'image': image, 'mbid': ''} if extended else {'mbid': self.mbid('artist', artist), '#text': f'Artist {artist}'},
+            'streamable': '0',
+            'image': image,
+            'mbid': self.mbid('track', song),
+            'album': {'mbid': self.mbid('album', album), '#text': f'Album {album}'},
+            'name': f'Track {song}',
+            'url': f'{url}/_/Track+{song}',
+            }
+        if extended:
+            item['loved'] = str(int(song % 7 == 0))
+        if idx is None:
+            item['@attr'] = {'nowplaying': 'true'}
+        else:
+            item['date'] = {'uts': str(self.timestamps[idx]), '#text': time.strftime('%d %b %Y, %H:%M', time.gmtime(self.timestamps[idx]))}
+        return item
+
+    def recenttracks(self, fr: int = None, to: int = None, page: int = 1, limit: int = 50, extended: bool = False, nowplaying: bool = True) -> dict[str, typing.Any]:
+        '''Emulate `user.getRecentTracks`: the plays between `fr` and `to` (inclusive), newest first, split into pages of `limit` plays, preceded on the first page by the track now playing unless `to` is given.'''
+        lo = bisect.bisect_left(self.timestamps, fr) if fr is not None else 0
+        hi = bisect.bisect_right(self.timestamps, to) if to is not None else self.plays
+        total = max(hi - lo, 0)
+        first = hi - (page - 1) * limit # newest play of the page (exclusive)
+        tracks = [self.track(idx, extended=extended) for idx in range(first - 1, max(first - limit, lo) - 1, -1)]
+        if nowplaying and (page == 1) and (to is None):
+            tracks.insert(0, self.track(extended=extended))
+        attr = {'user': self.user, 'totalPages': str(math.ceil(total / limit)), 'page': str(page), 'perPage': str(limit), 'total': str(total)}
+        return {'recenttracks': {'track': tracks, '@attr': attr}}
+
+    def info(self) -> dict[str, typing.Any]:
+        '''Emulate `user.getInfo`.'''
+        image = [{'size': size, '#text': ''} for size in ('small', 'medium', 'large', 'extralarge')]
+        counts = {'artist_count': str(len(set(song % self.artists for song in self.songs))), 'track_count': str(len(set(self.songs))), 'album_count': str(len(set(song // 10 for song in self.songs)))}
+        registered = {'unixtime': str(self.start), '#text': self.start}
+        return {'user': {'name': self.user, 'age': '0', 'subscriber': '0', 'realname': '', 'bootstrap': '0', 'playcount': str(self.plays), **counts, 'playlists': '0', 'image': image, 'registered': registered, 'country': 'None', 'gender': 'n', 'url': f'https://www.last.fm/user/{self.user}', 'type': 'user'}}
+
+
+@dataclasses.dataclass
+class StandIn:
+    '''Local stand-in for the Last.fm 2.0 API with configurable latency, rate limit and faults, to exercise clients without spending the real API quota.'''
+    history: History = dataclasses.field(default_factory=History)
+    address: str = '127.0.0.1'
+    port: int = int(os.getenv('LASTFM_STANDIN_PORT', '8000')) # 0 picks a free port
+    latency: float = float(os.getenv('LASTFM_STANDIN_LATENCY', '0.1')) # seconds
+    jitter: float = 0.0 # seconds, added uniformly at random to `latency`
+    rate: float = float(os.getenv('LASTFM_STANDIN_RATE', '5')) # requests per second per `api_key` (0 disables the rate limit)
+    burst: int = 10
+    faults: dict[lastfm.Errors, float] = dataclasses.field(default_factory=dict) # probability of answering with each error, e.g. `{Errors.OPERATION_FAILED: 0.01}`
+    nowplaying: bool = True
+    compress: bool = True # gzip responses to clients which accept it
+    seed: int = 0
+
+    def __post_init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {} # api_key: (tokens, time)
+        self.rng = random.Random(self.seed)
+        self.scrobbles = [] # (artist, track, timestamp) of every accepted `track.scrobble`
+        self.methods = {'user.getrecenttracks': self.recenttracks, 'user.getinfo': self.info, 'track.scrobble': self.scrobble} # method names are case-insensitive
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.address}:{self.port}/2.0/'
+
+    @staticmethod
+    def error(error: lastfm.Errors) -> tuple[int, dict[str, typing.Any]]:
+        return STATUS.get(error, 400), {'error': error.value, 'message': error.__doc__}
+
+    def throttle(self, api_key: str) -> bool:
+        '''Take a token from the bucket of `api_key` and return whether the request exceeds the rate limit.'''
+        if not self.rate:
+            return False
+        with self.lock:
+            now = time.monotonic()
+            tokens, last = self.buckets.get(api_key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            self.buckets[api_key] = (tokens - 1 if tokens >= 1 else tokens, now)
+            return tokens < 1
+
+    def fault(self) -> lastfm.Errors|None:
+        with self.lock:
+            draw = self.rng.random()
+        for error, probability in self.faults.items():
+            if draw < probability:
+                return error
+            draw -= probability
+
+    def user(self, params: dict[str, str]) -> bool:
+        return params.get('user', '').casefold() == self.history.user.casefold()
+
+    def recenttracks(self, params: dict[str, str]) -> tuple[int, dict[str, typing.Any]]:
+        if not self.user(params):
+            return self.error(lastfm.Errors.INVALID_PARAMETERS)
+        try:
+            fr, to = (int(params[key]) if params.get(key) else None for key in ('from', 'to'))
+            page, limit = max(int(params.get('page') or 1), 1), min(max(int(params.get('limit') or 50), 1), 1000)
+        except ValueError:
+            return self.error(lastfm.Errors.INVALID_PARAMETERS)
+        extended = params.get('extended') in ('1', 'true')
+        return 200, self.history.recenttracks(fr=fr, to=to, page=page, limit=limit, extended=extended, nowplaying=self.nowplaying)
+
+    def info(self, params: dict[str, str]) -> tuple[int, dict[str, typing.Any]]:
+        return (200, self.history.info()) if self.user(params) else self.error(lastfm.Errors.INVALID_PARAMETERS)
+
+    def scrobble(self, params: dict[str, str]) -> tuple[int, dict[str, typing.Any]]:
+        '''Emulate `track.scrobble` (without checking the signature): accept up to 50 plays, ignoring those more than 14 days old or more than a day ahead.'''
+        if not (params.get('sk') and params.get('api_sig')):
+            return self.error(lastfm.Errors.AUTHENTICATION_FAILED)
+        plays = [{'artist': params.get(f'artist[{idx}]'), 'track': params.get(f'track[{idx}]'), 'timestamp': params.get(f'timestamp[{idx}]'), 'album': params.get(f'album[{idx}]', '')} for idx in range(50) if f'artist[{idx}]' in params]
+        if not plays or any(not (play['artist'] and play['track'] and (play['timestamp'] or '').isdigit()) for play in plays):
+            return self.error(lastfm.Errors.INVALID_PARAMETERS)
+        now, scrobbles = time.time(), []
+        entity = lambda name: {'corrected': '0', '#text': name}
+        for play in plays:
+            timestamp = int(play['timestamp'])
+            code = models.track.ScrobbleErrors.OLD_TIMESTAMP if timestamp < now - 14 * 86400 else models.track.ScrobbleErrors.NEW_TIMESTAMP if timestamp > now + 86400 else models.track.ScrobbleErrors.OK
+            if code == models.track.ScrobbleErrors.OK:
+                with self.lock:
+                    self.scrobbles.append((play['artist'], play['track'], timestamp))
+            scrobbles.append({'artist': entity(play['artist']), 'album': entity(play['album']), 'track': entity(play['track']), 'albumArtist': entity(''), 'timestamp': play['timestamp'], 'ignoredMessage': {'code': str(code.value), '#text': code.__doc__}})
+        accepted = sum(scrobble['ignoredMessage']['code'] == '0' for scrobble in scrobbles)
+        return 200, {'scrobbles': {'scrobble': scrobbles, '@attr': {'accepted': accepted, 'ignored': len(scrobbles) - accepted}}}
+
+    def respond(self, params: dict[str, str]) -> tuple[int, dict[str, typing.Any]]:
+        '''Return the HTTP status and the body of the response to a request with `params`.'''
+        if not re.fullmatch(r'[0-9a-f]{32}', params.get('api_key', '')):
+            return self.error(lastfm.Errors.INVALID_API_KEY)
+        if self.throttle(params['api_key']):
+            return self.error(lastfm.Errors.RATE_LIMIT_EXCEEDED)
+        if params.get('method', '').lower() not in self.methods:
+            return self.error(lastfm.Errors.INVALID_METHOD)
+        if self.latency or self.jitter:
+            with self.lock:
+                delay = self.latency + self.rng.uniform(0, self.jitter)
+            time.sleep(delay)
+        error = self.fault()
+        return self.error(error) if error else self.methods[params['method'].lower()](params)
+
+    @staticmethod
+    def xml(tag: str, data: typing.Any) -> str:
+        '''Serialize `data` the way Last.fm does (the inverse of `lastfm.XML.convert`): `@attr` and the siblings of `#text` become attributes and lists become repeated elements.'''
+        escape = lambda val, quote=False: str(val).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;' if quote else '"')
+        if isinstance(data, list):
+            return ''.join(StandIn.xml(tag, item) for item in data)
+        if not isinstance(data, dict):
+            return f'<{tag}>{escape(data)}</{tag}>'
+        leaf = '#text' in data
+        attrs = {**data.get('@attr', {}), **({key: val for key, val in data.items() if key not in ('#text', '@attr')} if leaf else {})}
+        attrs = ''.join(f' {key}="{escape(val, quote=True)}"' for key, val in attrs.items())
+        body = escape(data['#text']) if leaf else ''.join(StandIn.xml(key, val) for key, val in data.items() if key != '@attr')
+        return f'<{tag}{attrs}>{body}</{tag}>'
+
+    def handler(self) -> type[http.server.BaseHTTPRequestHandler]:
+        standin = self
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1' # keep-alive, as `lastfm.Request` pools its connections
+            def do_GET(self):
+                url = urllib.parse.urlsplit(self.path)
+                if url.path.rstrip('/') != '/2.0':
+                    return self.send_error(404)
+                params = dict(urllib.parse.parse_qsl(url.query))
+                if self.command == 'POST':
+                    params |= dict(urllib.parse.parse_qsl(self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')))
+                status, response = standin.respond(params)
+                if params.get('format') == 'json':
+                    body, content_type = json.dumps(response, separators=(',', ':')).encode('utf-8'), 'application/json; charset=utf-8'
+                else:
+                    lfm = {'@attr': {'status': 'failed'}, 'error': {'code': response['error'], '#text': response['message']}} if 'error' in response else {'@attr': {'status': 'ok'}, **response}
+                    body, content_type = ('<?xml version="1.0" encoding="UTF-8"?>\n' + standin.xml('lfm', lfm)).encode('utf-8'), 'text/xml; charset=utf-8'
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                if standin.compress and ('gzip' in self.headers.get('Accept-Encoding', '')):
+                    body = gzip.compress(body, compresslevel=1)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            do_POST = do_GET
+            def log_message(self, format: str, *args):
+                logging.debug(format % args)
+        return Handler
+
+    def server(self) -> http.server.ThreadingHTTPServer:
+        '''Bind the server (to a free port if `port` is 0, updating `port`).'''
+        server = http.server.ThreadingHTTPServer((self.address, self.port), self.handler())
+        server.daemon_threads = True
+        self.port = server.server_port
+        logging.info(f'serving {self.history.plays} plays of {self.history.user} at {self.url}')
+        return server
+
+    def serve(self) -> http.server.ThreadingHTTPServer:
+        '''Serve from a daemon thread (stop it with `shutdown()`).'''
+        server = self.server()
+        threading.Thread(target=server.serve_forever, name='standin', daemon=True).start()
+        return server
+
+
+def main():
+    '''Serve the stand-in API until interrupted (configured by `LASTFM_STANDIN_PORT`, `LASTFM_STANDIN_LATENCY` and `LASTFM_STANDIN_RATE`).'''
+    lastfm.configureLogging(level=logging.INFO)
+    with StandIn().server() as server:
+        server.serve_forever()
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,21 @@
 #!/usr/bin/env python3
 
+import asyncio
+import pathlib
+import socket
+import tempfile
+import time
+
+import httpx
+
 from lastfm import *
+import enrich
+import graph
+import metrics
+import scrobble
+import standin
+
+# `LASTFM_CASSETTE=record python3 tests.py` records every response to `cassettes/`, which `LASTFM_CASSETTE=replay` then replays offline (`Cache` and `Corrections` are bypassed while cassettes are in use)
 
 
 class Misspelt:
@@ -48,9 +63,16 @@ def testArtist():
     artist.addTags(artist='_', tags=(0,1,2,3,4,5))
     [artist.removeTag(artist='_', tag=tag) for tag in (0,1,2,3,4,5)]
     [artist.getCorrection(artist=_) for _ in artists + [Misspelt.artist]]
+    assert (not Corrections.enabled) or (Corrections.lookup(Misspelt.artist)['artist_name'] == artist.getCorrection(artist=Misspelt.artist.upper()).correction.artist.name)
+    signed = {'artist': Misspelt.artist, 'tags': '0', 'sk': Auth.session_key, 'api_key': API_KEY, 'method': 'artist.addTags'}
+    assert Auth.calculate_api_sig(Corrections.correct(**signed, api_sig=Auth.calculate_api_sig(signed))) == Auth.calculate_api_sig(signed)
     [artist.getInfo(artist=_, user=usernames[0]) for _ in artists]
     [artist.getInfo(mbid=_, lang=languages[0]) for _ in artist_mbid]
     [artist.getInfo(artist=Misspelt.artist, autocorrect=_) for _ in (False, True)]
+    similar = graph.Crawl(depth=2, fanout=5, max_nodes=20).crawl(artists[:1])
+    assert (similar.nodes == 20) and (similar.neighbours(0)[0][1] >= similar.neighbours(0)[-1][1])
+    with Validate.trusted_arguments():
+        [artist.getInfo(artist=_, user=usernames[0]) for _ in artists]
     [artist.getSimilar(artist=_, limit=limit) for _ in artists]
     [artist.getSimilar(artist=Misspelt.artist, limit=limit, autocorrect=_) for _ in (False, True)]
     [artist.getTags(artist=_, user=usernames[0]) for _ in artists]
@@ -80,6 +102,7 @@ def testGeo():
 def testLibrary():
     [library.getArtists(user=_, limit=limit, page=page) for _ in usernames]
     assert len(library.getArtists(user='rj', limit=100, page=124).artist) == 100
+    assert len(list(library.iterArtists(user='rj', limit=1000, page=12))) > 1000
 
 def testTag():
     [tag.getInfo(tag=_, lang=languages[0]) for _ in tags]
@@ -100,6 +123,7 @@ def testTrack():
     [track.getInfo(artist=_, track=__, user=usernames[0]) for _, __ in zip(artists, tracks)]
     [track.getInfo(mbid=_, lang=languages[0], user=usernames[0]) for _ in track_mbid]
     [track.getInfo(artist=Misspelt.artist, track=Misspelt.track, autocorrect=_) for _ in (False, True)]
+    assert enrich.Enrich(user=usernames[0]).tracks(zip(artists + artists, tracks + tracks)).column('status').to_pylist() == ['ok'] * 4
     [track.getSimilar(artist=_, track=__, limit=limit) for _, __ in zip(artists, tracks)]
     [track.getSimilar(artist=Misspelt.artist, track=Misspelt.track, limit=limit, autocorrect=_) for _ in (False, True)]
     track.getSimilar(artist=artists[1], track=tracks[1], limit=300)
@@ -124,6 +148,9 @@ def testUser():
     user.getPersonalTags(tag=tags[1], taggingtype='artist', limit=10, page=1)
     [user.getRecentTracks(user=usernames[0], FROM=FROM, TO=TO, extended=extended, limit=limit, page=page) for extended in (False, True)]
     assert len(user.getRecentTracks(user='cdog215', limit=100, page=34949).track) == 100
+    assert all(track.date for track in user.iterRecentTracks(user=usernames[0], FROM=FROM, TO=TO, limit=limit))
+    assert Request.get(method='user.getRecentTracks', user=usernames[0], limit=limit, api_key=API_KEY, mode='arrow').num_rows >= limit
+    assert len(list(Request.get(method='user.getRecentTracks', user=usernames[0], limit=limit, api_key=API_KEY, format='xml'))) >= limit
     [user.getTopAlbums(user=_, limit=limit, page=page) for _ in usernames]
     [user.getTopAlbums(user=usernames[0], period=e, limit=limit, page=page) for e in Type.period]
     assert len(user.getTopAlbums(limit=100, page=157).album) == 100
@@ -141,7 +168,74 @@ def testUser():
     [user.getTrackScrobbles(user=_, artist=artists[0], track=tracks[0], TO=TO, limit=limit, page=page) for _ in usernames]
     assert len(user.getTrackScrobbles(user='cdog215', artist='slayer', track='raining blood', limit=100, page=28).track) == 100
 
+async def testAio():
+    await asyncio.gather(*[aio.artist.getInfo(artist=_) for _ in artists], *[aio.album.getInfo(artist=_, album=__) for _, __ in zip(artists, albums)])
+    await asyncio.gather(*[aio.user.getRecentTracks(user=usernames[0], limit=limit, page=p) for p in range(1, 4)])
+    assert len((await aio.user.getTopTracks(period='overall', limit=100, page=743)).track) == 100
+    await AsyncRequest.aclose()
+
+def testStandIn():
+    stand_in = standin.StandIn(port=0, latency=0, rate=0, history=standin.History(plays=5000))
+    server, url = stand_in.serve(), Request.url
+    Request.url = stand_in.url
+    try:
+        assert user.getInfo(user='standin').playcount == 5000
+        assert sum(len(user.getRecentTracks(user='standin', limit=1000, page=page).track) for page in range(1, 6)) == 5000 + 1 # and the track now playing
+        assert user.getRecentTracks(user='standin', limit=1, FROM=1262304000, TO=1704067199).attr.total == 5000
+    finally:
+        Request.url = url
+        server.shutdown()
+
+def testRetry():
+    stand_in = standin.StandIn(port=0, latency=0, rate=0, history=standin.History(plays=10), faults={Errors.OPERATION_FAILED: 1.0})
+    server, url, policy = stand_in.serve(), Request.url, (Retry.base, Retry.cap, Retry.budget)
+    Request.url, (Retry.base, Retry.cap, Retry.budget) = stand_in.url, (0.001, 0.01, 0.5)
+    retries = lambda: metrics.REGISTRY.counters[('api_retries_total', metrics.Registry.labels(client='lastfm', method='user.getInfo'))]
+    try:
+        before = retries()
+        assert (user.getInfo(user='standin').error == Errors.OPERATION_FAILED) and (retries() > before) # retried until the budget ran out
+        stand_in.faults = {Errors.RATE_LIMIT_EXCEEDED: 0.5}
+        assert user.getInfo(user='standin').playcount == 10
+        with socket.socket() as sock: # a port nobody listens on
+            sock.bind(('127.0.0.1', 0))
+            Request.url = f'http://127.0.0.1:{sock.getsockname()[1]}/2.0/'
+        before = retries()
+        try:
+            user.getInfo(user='standin')
+            raise AssertionError('expected httpx.ConnectError')
+        except httpx.ConnectError:
+            assert retries() > before
+    finally:
+        Request.url, (Retry.base, Retry.cap, Retry.budget) = url, policy
+        server.shutdown()
+
+def testScrobble():
+    stand_in = standin.StandIn(port=0, latency=0, rate=0, history=standin.History(plays=0))
+    server, url, secret, session_key = stand_in.serve(), Request.url, Auth.secret, Auth.session_key
+    Request.url, Auth.secret, Auth.session_key = stand_in.url, Auth.secret or '0' * 32, Auth.session_key or 'standin'
+    now = int(time.time())
+    plays = [dict(artist=f'Artist {idx % 7}', track=f'Track {idx}', timestamp=now - 60 * idx) for idx in range(120)]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = scrobble.Journal(path=pathlib.Path(tmp, 'scrobbles.sqlite'))
+            assert journal.add(plays + plays[:10] + [dict(artist='Artist 0', track='Track 0', timestamp=now - 30 * 86400), dict(artist='Artist 0', track=None, timestamp=now), dict(artist='Artist 0', track='Track 0')]) == 121 # duplicates and incomplete plays are skipped
+            assert journal.add(plays) == 0
+            stand_in.faults = {Errors.OPERATION_FAILED: 1.0}
+            assert journal.flush() == {'PENDING': 121} # failed calls leave their plays pending
+            stand_in.faults = {}
+            assert journal.flush() == {'OK': 120, 'OLD_TIMESTAMP': 1} and len(stand_in.scrobbles) == 120 # in 3 batches, one play ignored as too old
+            assert journal.flush() == {'OK': 120, 'OLD_TIMESTAMP': 1} and len(stand_in.scrobbles) == 120 # acknowledged plays are not submitted again
+            journal.connection.close()
+    finally:
+        Request.url, Auth.secret, Auth.session_key = url, secret, session_key
+        server.shutdown()
+
 def main():
+    configureLogging()
+    metrics.serve()
+    testStandIn()
+    testRetry()
+    testScrobble()
     testAlbum()
     testArtist()
     testChart()
@@ -150,6 +244,8 @@ def main():
     testTag()
     testTrack()
     testUser()
+    asyncio.run(testAio())
+    assert 'api_request_duration_seconds_count{client="lastfm",method="user.getRecentTracks"}' in metrics.REGISTRY.exposition()
 
 if __name__ == '__main__':
     main()
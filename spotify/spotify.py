@@ -11,13 +11,13 @@ import urllib
 import typing
 
 import awkward
-import rich.logging
 import rich.prompt
 
 '''[Spotify Web API](https://developer.spotify.com/documentation/web-api/reference/)'''
 
-rich_handler = rich.logging.RichHandler(rich_tracebacks=True, log_time_format='[%Y-%m-%d %H:%M:%S]') # [rich.logging](https://rich.readthedocs.io/en/stable/reference/logging.html)
-logging.basicConfig(level=logging.DEBUG, format='%(message)s', handlers=[rich_handler])
+def configureLogging(level: int|str = logging.INFO) -> None:
+    '''Configure logging for scripts (importing this module leaves logging alone).'''
+    logging.basicConfig(level=level, format='%(asctime)s %(levelname)-8s %(message)s')
 
 def csv(values: list[str], sep: str = ',') -> str:
     '''Merge list of strings into a strings with elements separated by `sep`.'''
@@ -75,7 +75,7 @@ class Auth:
         request = urllib.request.Request(method='POST', url=url, data=data, headers=self.clientAuth())
         with urllib.request.urlopen(url=request) as response:
             logging.debug(f'{request.method} | {response.status} | {request.full_url} | {dict(urllib.parse.parse_qsl(request.data.decode()))}')
-            return json.loads(response.read().decode('utf-8')).get('access_token')
+            return json.loads(response.read()).get('access_token')
 
     def userAuth(self) -> str:
         '''[Authorization Code Flow | Request User Authorization](https://developer.spotify.com/documentation/web-api/tutorials/code-flow#request-user-authorization)'''
@@ -92,7 +92,7 @@ class Auth:
         request = urllib.request.Request(method='POST', url='https://accounts.spotify.com/api/token', data=data, headers=headers)
         with urllib.request.urlopen(url=request) as response:
             logging.debug(f'{request.method} | {response.status} | {request.full_url} | {dict(urllib.parse.parse_qsl(request.data.decode()))}')
-            return json.loads(response.read().decode('utf-8'))
+            return json.loads(response.read())
 
     def requestAccessToken(self, code: str) -> None:
         '''[Authorization Code Flow | Request Access Token](https://developer.spotify.com/documentation/web-api/tutorials/code-flow#request-access-token)'''
@@ -125,15 +125,15 @@ class Spotify:
         with urllib.request.urlopen(url=request) as response:
             msg = f'{request.method} | {response.status} | {request.full_url}'
             logging.info(f'{msg} | {request.data.decode()}') if request.data else logging.info(msg)
-            response = response.read().decode('utf-8')
-            return awkward.from_json(source=response) if response else response
+            response = response.read()
+        return awkward.from_json(source=response) if response else response.decode('utf-8')
 
     @staticmethod
     def handleHTTPError(http_error: urllib.error.HTTPError) -> None:
         '''Read and parse `http_error`.'''
         logging.error(f'{http_error.status} | {http_error.reason} | {http_error.url}')
         if 'json' in http_error.headers.get('Content-Type', ''):
-            logging.error(json.loads(http_error.read().decode('utf-8')).get('error'))
+            logging.error(json.loads(http_error.read()).get('error'))
 
     @classmethod
     def response(cls, request: urllib.request.Request) -> awkward.Record:
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-from spotify import Auth, Album, Artist, Audiobook, Category, Chapter, Episode, Genre, Market, Player, Playlist, Search, Show, Track, User
+from spotify import configureLogging, Auth, Album, Artist, Audiobook, Category, Chapter, Episode, Genre, Market, Player, Playlist, Search, Show, Track, User
 
 auth = Auth()
 
@@ -157,6 +157,7 @@ def testUser():
     user.areFollowingPlaylist(playlist_id=playlist_id, ids=['jmperezperez', 'thelinmichael', 'wizzler'])
 
 def main():
+    configureLogging()
     testAlbum()
     testArtist()
     testAudiobook()